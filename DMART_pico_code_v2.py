@@ -3,9 +3,10 @@ import digitalio
 import analogio
 import sdcardio, storage
 import audiobusio, audiocore
+import keypad
 import alarm
-import random
 import microcontroller
+import struct
 
 # =========================================================
 # SETTINGS
@@ -13,26 +14,31 @@ import microcontroller
 LCD_COLS = 20
 LCD_ROWS = 4
 I2C_ADDR = 0x27
+I2C_FREQ = 400_000               # PCF8574 fast-mode; drop to 100_000 if NACKs
 
 SOUNDS_DIR = "/sd/Sounds"        # case-sensitive
 SLEEP_AFTER_S = 300              # 5 min idle -> sleep
 SLEEP_MESSAGE_S = 2.0            # hold "Sleeping..." before pulsing starts
 SLEEP_PULSE_S = 2.5              # backlight pulse cycle while asleep (seconds)
 
-COOLDOWN_S = 1.0                 # post-play cooldown
+COOLDOWN_MS = 1000               # post-play cooldown (all pads ignored)
 RELEASE_REQUIRED = True          # must release before retrigger
-TOUCH_DEBOUNCE_MS = 80           # pad must stay HIGH this long to register
+TOUCH_SCAN_MS = 20               # touch pad scan interval
+TOUCH_DEBOUNCE_MS = 80           # pad re-arms this long after its release
 
 COUNTDOWN_SHOW_S = 60            # show countdown in last N seconds before sleep
+COUNTDOWN_DIM_S = 30             # ...but only redraw it every 5 s below this
+COUNTDOWN_DARK_S = 10            # ...and blank display + backlight below this
 POWER_OFF_HOLD_S = 5             # hold I/O button this long to power off
 
 BOOT_WAV = f"{SOUNDS_DIR}/Boot.wav"
+START_WAV = f"{SOUNDS_DIR}/StartButton.wav"
 
 # Battery (Pimoroni Pico LiPo)
 BAT_FULL_V = 4.2                 # fully-charged LiPo
 BAT_EMPTY_V = 3.2                # practical empty (protects the cell)
 BAT_DIVIDER = 3                  # on-board voltage-divider ratio
-BAT_UPDATE_S = 30                # seconds between ADC reads
+BAT_UPDATE_S = 60                # seconds between ADC reads
 BAT_LOW_PCT = 15                 # show warning below this
 BAT_CRIT_PCT = 5                 # auto power-off below this
 
@@ -47,7 +53,7 @@ EASTER_EGG_MSG = "You found the secret!"
 TOUCH_EXPR = ["surprised", "center", "happy", ("center", "wink_shut"), "surprised"]
 
 # Snarky climate messages — shown randomly when a touch pad is pressed
-CLIMATE_MSGS = [
+CLIMATE_MSGS = (
     "Planet B? Nope.",
     "Act now or swim later",
     "Cool it. Literally.",
@@ -68,13 +74,13 @@ CLIMATE_MSGS = [
     "Save water. Drink tea",
     "Reduce. Reuse. Relax",
     "Earth called. Pick up",
-]
+)
 
 # =========================================================
 # LCD (PCF8574 backpack)  SDA=GP0  SCL=GP1
 # Flicker fix: only redraws when text actually changes
 # =========================================================
-i2c = busio.I2C(scl=board.GP1, sda=board.GP0, frequency=50000)
+i2c = busio.I2C(scl=board.GP1, sda=board.GP0, frequency=I2C_FREQ)
 
 ENABLE = 0x04
 RS = 0x01
@@ -83,14 +89,22 @@ _backlight_on = True
 _last_lcd_1 = None
 _last_lcd_2 = None
 
+# Shadow copy of the character codes on the glass, row-major.  Redraws
+# diff against it and only rewrite the cells that changed.
+_fb = bytearray(b" " * (LCD_COLS * LCD_ROWS))
+# Last str/bytes handed to lcd_write_row() per row; a repeat is a no-op.
+_row_src = [None] * LCD_ROWS
+
 def lcd_reset():
     global _last_lcd_1, _last_lcd_2, _last_eye_state, _loaded_expr_l, _loaded_expr_r, _loaded_mouth
+    global _display_dark
     _last_lcd_1 = None
     _last_lcd_2 = None
     _last_eye_state = None
     _loaded_expr_l = None
     _loaded_expr_r = None
     _loaded_mouth = None
+    _display_dark = False
     lcd_init()
     lcd_clear()
 
@@ -98,36 +112,48 @@ def lcd_backlight(on):
     global _backlight_on
     _backlight_on = bool(on)
 
-def _i2c_write(byte_val):
+def _i2c_write(buf, end=None):
+    """Send *buf* (or its first *end* bytes) to the backpack in a single
+    locked transaction."""
     while not i2c.try_lock():
         pass
     try:
-        i2c.writeto(I2C_ADDR, bytes([byte_val]))
+        if end is None:
+            i2c.writeto(I2C_ADDR, buf)
+        else:
+            i2c.writeto(I2C_ADDR, buf, end=end)
     finally:
         i2c.unlock()
 
 def _write_byte(b):
     bl = 0x08 if _backlight_on else 0x00
-    _i2c_write(b | bl)
-
-def _pulse_enable(b):
-    _write_byte(b | ENABLE)
-    time.sleep(0.0005)
-    _write_byte(b & ~ENABLE)
-    time.sleep(0.0001)
+    _i2c_write(bytes([b | bl]))
+
+# Each nibble is clocked as (data, data|E, data): the HD44780 latches on
+# the falling edge of E, and one I2C byte at bus speed is already far
+# longer than the 450 ns E-pulse minimum, so no sleeps are needed.
+def _put_byte(buf, i, val, mode):
+    """Encode *val* as two E-strobed nibbles into *buf* at *i*.
+    Returns the index just past the 6 bytes written."""
+    bl = 0x08 if _backlight_on else 0x00
+    hi = (val & 0xF0) | mode | bl
+    lo = ((val << 4) & 0xF0) | mode | bl
+    buf[i] = hi
+    buf[i + 1] = hi | ENABLE
+    buf[i + 2] = hi
+    buf[i + 3] = lo
+    buf[i + 4] = lo | ENABLE
+    buf[i + 5] = lo
+    return i + 6
 
 def _lcd_write_nibble(nibble, mode=0):
-    b = (nibble & 0xF0) | mode
-    _write_byte(b)
-    _pulse_enable(b)
+    b = (nibble & 0xF0) | mode | (0x08 if _backlight_on else 0x00)
+    _i2c_write(bytes((b, b | ENABLE, b)))
 
 def lcd_cmd(cmd):
-    _lcd_write_nibble(cmd & 0xF0, 0)
-    _lcd_write_nibble((cmd << 4) & 0xF0, 0)
-
-def lcd_data(data):
-    _lcd_write_nibble(data & 0xF0, RS)
-    _lcd_write_nibble((data << 4) & 0xF0, RS)
+    buf = bytearray(6)
+    _put_byte(buf, 0, cmd, 0)
+    _i2c_write(buf)
 
 def lcd_init():
     time.sleep(0.05)
@@ -146,37 +172,115 @@ def lcd_init():
 def lcd_clear():
     lcd_cmd(0x01)
     time.sleep(0.005)
+    for i in range(len(_fb)):
+        _fb[i] = 0x20
+    for r in range(LCD_ROWS):
+        _row_src[r] = None
 
-def lcd_set_cursor(row, col):
-    offsets = [0x80, 0xC0, 0x94, 0xD4]
-    lcd_cmd(offsets[row] + col)
+_ROW_OFFSETS = bytes((0x80, 0xC0, 0x94, 0xD4))
 
-def lcd_print(s):
-    for ch in s:
-        lcd_data(ord(ch))
+# Display-off (0x08) blanks the glass but keeps DDRAM/CGRAM, so turning
+# it back on (0x0C) restores the last frame without a redraw.
+_display_dark = False
+
+def _lcd_dark(dark):
+    """Blank the display and backlight, or bring both back."""
+    global _display_dark
+    if dark == _display_dark:
+        return
+    _display_dark = dark
+    if dark:
+        lcd_cmd(0x08)
+        _set_backlight(False)
+    else:
+        _set_backlight(True)
+        lcd_cmd(0x0C)
+
+# set-cursor command + up to a full row of characters
+_burst_buf = bytearray(6 * (LCD_COLS + 1))
+
+def _lcd_burst(row, col, data):
+    """Move the cursor to (*row*, *col*) and print *data* (bytes-like
+    character codes) in one I2C write."""
+    i = _put_byte(_burst_buf, 0, _ROW_OFFSETS[row] + col, 0)
+    for c in data:
+        i = _put_byte(_burst_buf, i, c, RS)
+    _i2c_write(_burst_buf, i)
+
+def lcd_write_row(row, data):
+    """Bring *row* in line with *data* (LCD_COLS character codes as a str or
+    bytes-like).  Only the span from the first to the last cell that
+    differs from the shadow buffer is sent, in one I2C write."""
+    if isinstance(data, (str, bytes)):
+        if data == _row_src[row]:
+            return
+        _row_src[row] = data
+        if isinstance(data, str):
+            data = data.encode()
+    else:
+        _row_src[row] = None          # views may alias reused buffers
+    base = row * LCD_COLS
+    first = 0
+    while first < LCD_COLS and _fb[base + first] == data[first]:
+        first += 1
+    if first == LCD_COLS:
+        return
+    last = LCD_COLS - 1
+    while _fb[base + last] == data[last]:
+        last -= 1
+    _fb[base + first:base + last + 1] = data[first:last + 1]
+    _lcd_burst(row, first, data[first:last + 1])
+
+_SPACES = " " * LCD_COLS          # padding is sliced from here
+_BLANK_ROW = b" " * LCD_COLS
+
+# Padded lines are requested with the same arguments on every idle tick,
+# so keep the last few around.  Cleared wholesale when full.
+_LINE_CACHE_MAX = 32
+_fit_cache = {}
+_line_cache = {}
 
 def _fit_line(s, width, center=False):
     s = "" if s is None else str(s)
+    key = (s, width, center)
+    line = _fit_cache.get(key)
+    if line is not None:
+        return line
     if len(s) > width:
-        return s[:width]
-    if center:
+        line = s[:width]
+    elif center:
         pad_total = width - len(s)
         left = pad_total // 2
         right = pad_total - left
-        return (" " * left) + s + (" " * right)
-    return s + (" " * (width - len(s)))
+        line = _SPACES[:left] + s + _SPACES[:right]
+    else:
+        line = s + _SPACES[:width - len(s)]
+    if len(_fit_cache) >= _LINE_CACHE_MAX:
+        _fit_cache.clear()
+    _fit_cache[key] = line
+    return line
 
 def _lcd_line(left, right="", width=LCD_COLS):
     """Left-align *left*, right-align *right*, pad the gap with spaces."""
     if not right:
         return _fit_line(left, width)
+    key = (left, right, width)
+    line = _line_cache.get(key)
+    if line is not None:
+        return line
     gap = width - len(left) - len(right)
     if gap < 1:
-        return (left + " " + right)[:width]
-    return left + (" " * gap) + right
+        line = (left + " " + right)[:width]
+    else:
+        line = left + _SPACES[:gap] + right
+    if len(_line_cache) >= _LINE_CACHE_MAX:
+        _line_cache.clear()
+    _line_cache[key] = line
+    return line
 
 def lcd_show(line1="", line2="", center=False):
-    global _last_lcd_1, _last_lcd_2
+    global _last_lcd_1, _last_lcd_2, _last_eye_state
+    _lcd_dark(False)
     l1 = _fit_line(line1, LCD_COLS, center=center)
     l2 = _fit_line(line2, LCD_COLS, center=center)
 
@@ -184,42 +288,45 @@ def lcd_show(line1="", line2="", center=False):
         return
 
     _last_lcd_1, _last_lcd_2 = l1, l2
+    _last_eye_state = None
 
-    lcd_clear()
     # Center vertically on the 4-row display (rows 1-2)
-    lcd_set_cursor(1, 0); lcd_print(l1)
-    lcd_set_cursor(2, 0); lcd_print(l2)
-
-def _scroll_frames(s, width):
+    lcd_write_row(0, _BLANK_ROW)
+    lcd_write_row(1, l1)
+    lcd_write_row(2, l2)
+    lcd_write_row(3, _BLANK_ROW)
+
+def _scroll_frames(s, width, center=False):
+    """Return (view, count): frame i of the line is view[i:i + width],
+    a zero-copy slice of one doubled buffer."""
     s = "" if s is None else str(s)
     if len(s) <= width:
-        return [s]
+        return memoryview(_fit_line(s, width, center=center).encode()), 1
     gap = "   "
-    scroll = s + gap
-    frames = []
-    for i in range(len(scroll)):
-        window = (scroll + scroll)[i:i + width]
-        frames.append(window)
-    return frames
+    buf = bytearray((s + gap).encode() * 2)
+    return memoryview(buf), len(s) + len(gap)
 
 def lcd_show_scroll(line1="", line2="", center=False,
                     step_s=0.18, hold_s=1.0, loops=2):
-    f1 = _scroll_frames(line1, LCD_COLS)
-    f2 = _scroll_frames(line2, LCD_COLS)
+    global _last_lcd_1, _last_lcd_2, _last_eye_state
+    v1, n1 = _scroll_frames(line1, LCD_COLS, center)
+    v2, n2 = _scroll_frames(line2, LCD_COLS, center)
 
-    if len(f1) == 1 and len(f2) == 1:
+    if n1 == 1 and n2 == 1:
         lcd_show(line1, line2, center=center)
         time.sleep(hold_s)
         return
 
-    max_len = max(len(f1), len(f2))
+    _lcd_dark(False)
+    _last_lcd_1 = _last_lcd_2 = _last_eye_state = None
+    lcd_write_row(0, _BLANK_ROW)
+    lcd_write_row(3, _BLANK_ROW)
     for _ in range(loops):
-        for i in range(max_len):
-            a = (f1[i % len(f1)] if len(f1) > 1
-                 else _fit_line(f1[0], LCD_COLS, center=center))
-            b = (f2[i % len(f2)] if len(f2) > 1
-                 else _fit_line(f2[0], LCD_COLS, center=center))
-            lcd_show(a, b, center=False)
+        for i in range(max(n1, n2)):
+            a = i % n1
+            b = i % n2
+            lcd_write_row(1, v1[a:a + LCD_COLS])
+            lcd_write_row(2, v2[b:b + LCD_COLS])
             time.sleep(step_s)
     time.sleep(0.25)
 
@@ -277,6 +384,10 @@ _MOUTHS = {
                 [0x00, 0x00, 0x00, 0x00, 0x10, 0x08, 0x08, 0x10]),  #   )
 }
 
+# Freeze the bitmaps as bytes so a CGRAM load just walks a byte string
+_EYES = {k: tuple(bytes(b) for b in v) for k, v in _EYES.items()}
+_MOUTHS = {k: tuple(bytes(b) for b in v) for k, v in _MOUTHS.items()}
+
 # Which mouth pairs with which eye expression
 _MOUTH_FOR_EXPR = {
     "center":    "neutral",
@@ -293,10 +404,18 @@ _loaded_expr_l = None
 _loaded_expr_r = None
 _loaded_mouth = None
 
+# Face rows as character codes: CGRAM slots 0-3 are the eyes, 4-6 the mouth
+_EYES_ROW  = b"      \x00\x01   \x02\x03       "   # "      LL   RR       "
+_MOUTH_ROW = b"        \x04\x05\x06         "      # "        MMM         "
+
+_cgram_buf = bytearray(6 * 9)     # set-CGRAM-address cmd + 8 pixel rows
+
 def _lcd_create_char(slot, bitmap):
-    lcd_cmd(0x40 | (slot << 3))
+    # address + all 8 rows go out in a single transaction
+    i = _put_byte(_cgram_buf, 0, 0x40 | (slot << 3), 0)
     for b in bitmap:
-        lcd_data(b)
+        i = _put_byte(_cgram_buf, i, b, RS)
+    _i2c_write(_cgram_buf)
 
 def _load_expression(left_name, right_name=None):
     """Write eye bitmaps into CGRAM slots 0-1 (left) and 2-3 (right).
@@ -343,33 +462,52 @@ EYE_SEQUENCE = [
     ("happy",  2.0),
 ]
 
-_eye_idx = 0
-_eye_t = 0.0
+# Precomputed schedule: frame i covers [_EYE_CUM[i], _EYE_CUM[i+1]) seconds
+# into the loop, so the current frame is a lookup rather than a state machine.
+_EYE_NAMES = [name for name, _ in EYE_SEQUENCE]
+_EYE_CUM = [0.0]
+for _, _d in EYE_SEQUENCE:
+    _EYE_CUM.append(_EYE_CUM[-1] + _d)
+_EYE_TOTAL = _EYE_CUM[-1]
+
+_eye_anim_start = 0.0
 
 def _reset_eye_anim():
-    global _eye_idx, _eye_t
-    _eye_idx = 0
-    _eye_t = time.monotonic()
-
-def _current_eye():
-    """Advance the animation and return the current expression.
-    Returns a string (symmetric) or tuple (left, right) for asymmetric."""
-    global _eye_idx, _eye_t
-    now = time.monotonic()
-    name, dur = EYE_SEQUENCE[_eye_idx]
-    if (now - _eye_t) >= dur:
-        _eye_idx = (_eye_idx + 1) % len(EYE_SEQUENCE)
-        _eye_t = now
-        name = EYE_SEQUENCE[_eye_idx][0]
-    return name
+    global _eye_anim_start
+    _eye_anim_start = time.monotonic()
+
+def _eye_index(t):
+    """Frame index for *t* seconds into the loop (binary search; there is
+    no bisect module on CircuitPython)."""
+    lo, hi = 0, len(_EYE_NAMES)
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if _EYE_CUM[mid] <= t:
+            lo = mid
+        else:
+            hi = mid
+    return lo
+
+def _current_eye(now):
+    """Return the expression showing at *now*: a string (symmetric) or a
+    tuple (left, right) for asymmetric."""
+    t = (now - _eye_anim_start) % _EYE_TOTAL
+    return _EYE_NAMES[_eye_index(t)]
+
+def _next_eye_change(now):
+    """Monotonic time at which the frame showing at *now* ends."""
+    t = (now - _eye_anim_start) % _EYE_TOTAL
+    return now + _EYE_CUM[_eye_index(t) + 1] - t
 
 # Separate change-detection for the eye display
 _last_eye_state = None
 
-def lcd_show_eyes(text, expr_name, bat_str, mouth=None):
+def lcd_show_eyes(text, expr_name, bat_str, mouth=None, bottom=None):
     """Draw face on rows 0-1, text + battery on row 3.
-    expr_name can be a string or tuple (left_expr, right_expr)."""
+    expr_name can be a string or tuple (left_expr, right_expr).
+    A padded *bottom* row replaces the text + battery."""
     global _last_lcd_1, _last_lcd_2, _last_eye_state
+    _lcd_dark(False)
 
     # Unpack asymmetric expression
     if isinstance(expr_name, tuple):
@@ -380,10 +518,8 @@ def lcd_show_eyes(text, expr_name, bat_str, mouth=None):
 
     if mouth is None:
         mouth = _MOUTH_FOR_EXPR.get(left_expr, "neutral")
-    if bat_str:
-        bottom = _lcd_line(text, bat_str)
-    else:
-        bottom = _fit_line(text, LCD_COLS)
+    if bottom is None:
+        bottom = _lcd_line(text, bat_str) if bat_str else _fit_line(text, LCD_COLS)
     state = (left_expr, right_expr, mouth, bat_str, bottom)
     if state == _last_eye_state:
         return
@@ -394,19 +530,12 @@ def lcd_show_eyes(text, expr_name, bat_str, mouth=None):
     _load_expression(left_expr, right_expr)
     _load_mouth(mouth)
 
-    lcd_clear()
-    # Row 0: eyes        "      LL   RR      "
-    lcd_set_cursor(0, 6)
-    lcd_data(0); lcd_data(1)       # left eye  (slots 0,1)
-    lcd_set_cursor(0, 11)
-    lcd_data(2); lcd_data(3)       # right eye (slots 2,3)
-    # Row 1: mouth       "       MMM         "
-    lcd_set_cursor(1, 8)
-    lcd_data(4); lcd_data(5); lcd_data(6)
-    # Row 2: (empty — breathing room)
-    # Row 3: text + battery
-    lcd_set_cursor(3, 0)
-    lcd_print(bottom)
+    # Eye/mouth cells show CGRAM live, so once drawn only the text row
+    # normally differs from the shadow buffer.
+    lcd_write_row(0, _EYES_ROW)
+    lcd_write_row(1, _MOUTH_ROW)
+    lcd_write_row(2, _BLANK_ROW)   # empty — breathing room
+    lcd_write_row(3, bottom)       # text + battery
 
 # =========================================================
 # Battery monitoring (Pimoroni Pico LiPo)
@@ -414,32 +543,39 @@ def lcd_show_eyes(text, expr_name, bat_str, mouth=None):
 # =========================================================
 _bat_adc = analogio.AnalogIn(board.BAT_SENSE)
 _bat_pct_cache = -1
+_bat_str_cache = ""
 _bat_last_read = 0.0
 
-def read_battery_pct():
-    """Read LiPo voltage via ADC, return 0-100 %.  Cached for BAT_UPDATE_S."""
-    global _bat_pct_cache, _bat_last_read
-    now = time.monotonic()
-    if _bat_pct_cache >= 0 and (now - _bat_last_read) < BAT_UPDATE_S:
-        return _bat_pct_cache
-    # average a few samples for stability
-    total = 0
-    for _ in range(5):
-        total += _bat_adc.value
-        time.sleep(0.001)
-    voltage = (total / 5 / 65535) * 3.3 * BAT_DIVIDER
+_BAT_SAMPLES = 3
+_BAT_SCALE = 3.3 * BAT_DIVIDER / (65535 * _BAT_SAMPLES)   # raw sum -> volts
+_LOW_BAT_ROW = _fit_line("!! Low Battery !!", LCD_COLS, center=True)
+
+def read_battery_pct(now=None):
+    """Read LiPo voltage via ADC, return 0-100 %.  Cached for BAT_UPDATE_S.
+    *now* is the caller's time.monotonic(), if it already has one."""
+    global _bat_pct_cache, _bat_str_cache, _bat_last_read
+    if now is None:
+        now = time.monotonic()
+    if _bat_pct_cache >= 0 and (
+            (now - _bat_last_read) < BAT_UPDATE_S or audio.playing):
+        return _bat_pct_cache     # stale by a minute is fine; I2S DMA adds ADC noise
+    # average a few back-to-back samples (the ADC settles in microseconds)
+    total = sum(_bat_adc.value for _ in range(_BAT_SAMPLES))
+    voltage = total * _BAT_SCALE
     pct = int((voltage - BAT_EMPTY_V) / (BAT_FULL_V - BAT_EMPTY_V) * 100)
     _bat_pct_cache = max(0, min(100, pct))
+    _bat_str_cache = f"{_bat_pct_cache}%"
     _bat_last_read = now
     return _bat_pct_cache
 
-def _bat_str():
+def _bat_str(now=None):
     """Right-hand label for the idle screen, e.g. '85%'."""
-    return f"{read_battery_pct()}%"
+    read_battery_pct(now)
+    return _bat_str_cache
 
-def _check_low_battery():
+def _check_low_battery(now=None):
     """Return 'critical', 'low', or None based on battery level."""
-    pct = read_battery_pct()
+    pct = read_battery_pct(now)
     if pct <= BAT_CRIT_PCT:
         return "critical"
     if pct <= BAT_LOW_PCT:
@@ -452,6 +588,8 @@ def _check_low_battery():
 # =========================================================
 _interaction_count = 0
 _interaction_pending = 0          # touches since last NVM write
+_NVM_FLUSH_EVERY = 50             # touches between NVM (flash) writes
+_NVM_BUF = bytearray(4)
 
 def _load_interaction_count():
     global _interaction_count
@@ -465,16 +603,17 @@ def _load_interaction_count():
 def _save_interaction_count():
     global _interaction_pending
     _interaction_pending = 0
-    microcontroller.nvm[0:4] = _interaction_count.to_bytes(4, "little")
+    struct.pack_into("<I", _NVM_BUF, 0, _interaction_count)
+    microcontroller.nvm[0:4] = _NVM_BUF
 
 def _increment_interaction():
     global _interaction_count, _interaction_pending
     _interaction_count += 1
     _interaction_pending += 1
-    if _interaction_pending >= 10:
+    if _interaction_pending >= _NVM_FLUSH_EVERY:
         _save_interaction_count()
 
-_MILESTONES = (50, 100, 200, 500, 1000)
+_MILESTONES = frozenset((50, 100, 200, 500, 1000))
 
 def _check_milestone():
     """If the current count is a milestone, show celebration and return True."""
@@ -487,17 +626,21 @@ def _check_milestone():
 # =========================================================
 # Easter egg (3-pad combo)
 # =========================================================
-_last_pads = []
+# The last few pads are packed 3 bits each into one int, stored as
+# pad+1 so an empty slot (0) never matches pad 0.
+_EGG_MASK = (1 << (3 * len(EASTER_EGG_SEQ))) - 1
+_EGG_TARGET = 0
+for _p in EASTER_EGG_SEQ:
+    _EGG_TARGET = (_EGG_TARGET << 3) | (_p + 1)
+_last_pads = 0
 
 def _check_easter_egg(pad_idx):
     """Track last 3 pads pressed. If they match EASTER_EGG_SEQ,
     show secret message and return True (skip normal playback)."""
     global _last_pads
-    _last_pads.append(pad_idx)
-    if len(_last_pads) > len(EASTER_EGG_SEQ):
-        _last_pads = _last_pads[-len(EASTER_EGG_SEQ):]
-    if _last_pads == EASTER_EGG_SEQ:
-        _last_pads = []
+    _last_pads = ((_last_pads << 3) | (pad_idx + 1)) & _EGG_MASK
+    if _last_pads == _EGG_TARGET:
+        _last_pads = 0
         lcd_show_eyes(EASTER_EGG_MSG, "happy", "")
         time.sleep(3.0)
         return True
@@ -509,11 +652,10 @@ def _check_easter_egg(pad_idx):
 _chatter_idx = -1                 # -1 = show default text first
 _chatter_t = 0.0                  # time of last rotation
 
-def _get_chatter_text(default):
+def _get_chatter_text(default, now):
     """Return default text for the first cycle, then rotate through
     CLIMATE_MSGS every IDLE_CHATTER_S seconds."""
     global _chatter_idx, _chatter_t
-    now = time.monotonic()
     if _chatter_idx < 0:
         # First cycle — use default
         if (now - _chatter_t) >= IDLE_CHATTER_S:
@@ -530,6 +672,32 @@ def _reset_chatter():
     _chatter_idx = -1
     _chatter_t = time.monotonic()
 
+# Touch messages are dealt from a shuffled order that is reshuffled when
+# it runs out, so none repeats until all have been shown.  The shuffle uses
+# a tiny LCG rather than importing random; it is seeded from the clock at
+# the first touch, which a human makes random.
+_rot_idx = 0
+_msg_order = bytearray(range(len(CLIMATE_MSGS)))
+_msg_pos = len(CLIMATE_MSGS)      # used up: shuffle before the first touch
+
+def _rand_below(n):
+    global _rot_idx
+    if not _rot_idx:
+        _rot_idx = time.monotonic_ns() & 0x7FFFFFFF
+    _rot_idx = (_rot_idx * 1103515245 + 12345) & 0x7FFFFFFF
+    return (_rot_idx >> 16) % n
+
+def _pick():
+    """Return the next entry of CLIMATE_MSGS in shuffled order."""
+    global _msg_pos
+    if _msg_pos >= len(_msg_order):
+        for i in range(len(_msg_order) - 1, 0, -1):      # Fisher-Yates
+            j = _rand_below(i + 1)
+            _msg_order[i], _msg_order[j] = _msg_order[j], _msg_order[i]
+        _msg_pos = 0
+    _msg_pos += 1
+    return CLIMATE_MSGS[_msg_order[_msg_pos - 1]]
+
 # =========================================================
 # LCD status helpers
 # =========================================================
@@ -544,7 +712,7 @@ def _play_boot_sound():
         f.close()
     except OSError:
         return
-    amp_en.value = True
+    _set_amp(True)
     time.sleep(0.15)
     try:
         with open(BOOT_WAV, "rb") as f:
@@ -556,37 +724,48 @@ def _play_boot_sound():
         pass
     audio.stop()
     time.sleep(0.15)
-    amp_en.value = False
+    _set_amp(False)
 
-def lcd_idle_armed(countdown_s=None):
-    expr = _current_eye()
-    bat = _bat_str()
-    # Force sleepy eyes in the last 60 s before sleep
-    if countdown_s is not None and countdown_s <= COUNTDOWN_SHOW_S:
-        expr = "sleepy"
-        m, s = divmod(max(0, int(countdown_s)), 60)
-        txt = f"Touch a panel {m}:{s:02d}"
-        lcd_show_eyes(txt, expr, bat)
-    else:
-        txt = _get_chatter_text("Touch a panel")
-        lcd_show_eyes(txt, expr, bat)
+# The idle screen can't change before _next_refresh, as long as what it
+# last drew is still on the glass (anything else drawn replaces the state).
+_next_refresh = 0.0
+_idle_state = None
 
-def lcd_idle_disarmed(countdown_s=None):
-    expr = _current_eye()
-    bat = _bat_str()
-    # Force sleepy eyes in the last 60 s before sleep
+def _lcd_idle(prompt, countdown_s, now):
+    global _next_refresh, _idle_state
+    if now < _next_refresh and _last_eye_state is _idle_state:
+        return
+    # Sleepy eyes in the last COUNTDOWN_SHOW_S before sleep.  Nobody is
+    # interacting by then, so the countdown ticks every 5 s below
+    # COUNTDOWN_DIM_S and the display goes dark below COUNTDOWN_DARK_S.
+    # A flashing low-battery warning takes over the bottom row.
+    bottom = _LOW_BAT_ROW if _bat_flash_on else None
     if countdown_s is not None and countdown_s <= COUNTDOWN_SHOW_S:
-        expr = "sleepy"
-        m, s = divmod(max(0, int(countdown_s)), 60)
-        txt = f"Press I/O {m}:{s:02d}"
-        lcd_show_eyes(txt, expr, bat)
+        if countdown_s < COUNTDOWN_DARK_S:
+            _lcd_dark(True)
+        else:
+            secs = max(0, int(countdown_s))
+            if countdown_s > COUNTDOWN_DIM_S or secs % 5 == 0:
+                m, s = divmod(secs, 60)
+                lcd_show_eyes(f"{prompt} {m}:{s:02d}", "sleepy", _bat_str(now),
+                              bottom=bottom)
     else:
-        txt = _get_chatter_text("Press I/O")
-        lcd_show_eyes(txt, expr, bat)
+        lcd_show_eyes(_get_chatter_text(prompt, now), _current_eye(now),
+                      _bat_str(now), bottom=bottom)
+    _idle_state = _last_eye_state
+    _next_refresh = _next_idle_deadline(now)
+
+def lcd_idle_armed(countdown_s=None, now=None):
+    _lcd_idle("Touch a panel", countdown_s,
+              time.monotonic() if now is None else now)
+
+def lcd_idle_disarmed(countdown_s=None, now=None):
+    _lcd_idle("Press I/O", countdown_s,
+              time.monotonic() if now is None else now)
 
 def lcd_playing(label, expr=None):
     if expr is None:
-        expr = _current_eye()
+        expr = _current_eye(time.monotonic())
     lcd_show_eyes(label, expr, "", mouth="open")
 
 def lcd_missing(name):
@@ -598,6 +777,7 @@ def lcd_sleeping():
 def lcd_sleeping_face():
     """Draw closed eyes + mouth on rows 0-1, Zzz on row 2, Press I/O on row 3."""
     global _last_lcd_1, _last_lcd_2, _last_eye_state
+    _lcd_dark(False)
     _last_eye_state = None
     _last_lcd_1 = None
     _last_lcd_2 = None
@@ -605,21 +785,10 @@ def lcd_sleeping_face():
     _load_expression("blink")
     _load_mouth("neutral")
 
-    lcd_clear()
-    # Row 0: closed eyes
-    lcd_set_cursor(0, 6)
-    lcd_data(0); lcd_data(1)
-    lcd_set_cursor(0, 11)
-    lcd_data(2); lcd_data(3)
-    # Row 1: mouth
-    lcd_set_cursor(1, 8)
-    lcd_data(4); lcd_data(5); lcd_data(6)
-    # Row 2: Zzz
-    lcd_set_cursor(2, 0)
-    lcd_print(_fit_line("Zzz", LCD_COLS, center=True))
-    # Row 3: Press I/O
-    lcd_set_cursor(3, 0)
-    lcd_print(_fit_line("Press I/O", LCD_COLS, center=True))
+    lcd_write_row(0, _EYES_ROW)    # closed eyes
+    lcd_write_row(1, _MOUTH_ROW)
+    lcd_write_row(2, _fit_line("Zzz", LCD_COLS, center=True))
+    lcd_write_row(3, _fit_line("Press I/O", LCD_COLS, center=True))
 
 # =========================================================
 # AMP ENABLE (MAX98357A SD -> GP22)
@@ -627,16 +796,53 @@ def lcd_sleeping_face():
 amp_en = digitalio.DigitalInOut(board.GP22)
 amp_en.direction = digitalio.Direction.OUTPUT
 amp_en.value = False
+_amp_en_cache = False
+
+def _set_amp(on):
+    """Drive the amp enable pin, skipping the write if it's already there."""
+    global _amp_en_cache
+    if _amp_en_cache != on:
+        amp_en.value = on
+        _amp_en_cache = on
 
 # =========================================================
 # Mac mini button -> GP21 to GND (active LOW)
 # =========================================================
-reset_btn = digitalio.DigitalInOut(board.GP21)
-reset_btn.direction = digitalio.Direction.INPUT
-reset_btn.pull = digitalio.Pull.UP
+# Scanned by keypad in the background like the touch pads; start_pressed()
+# just drains its edge events instead of sampling the pin.  Any press is
+# also latched in _io_pressed, so a tap that is over before the next check
+# still counts.
+def _make_io_keys():
+    return keypad.Keys((board.GP21,), value_when_pressed=False, pull=True)
+
+io_keys = _make_io_keys()
+_io_event = keypad.Event()
+_io_down = False
+_io_pressed = False
+
+def _drain_io():
+    global _io_down, _io_pressed
+    while io_keys.events.get_into(_io_event):
+        _io_down = _io_event.pressed
+        if _io_down:
+            _io_pressed = True
 
 def start_pressed():
-    return not reset_btn.value
+    """True while the button is held."""
+    _drain_io()
+    return _io_down
+
+def io_press_pending():
+    """True if the button went down since the last take_io_press()."""
+    _drain_io()
+    return _io_pressed
+
+def take_io_press():
+    """Consume the latched press; returns whether there was one."""
+    global _io_pressed
+    pending = io_press_pending()
+    _io_pressed = False
+    return pending
 
 # =========================================================
 # SD Card (SPI)  SCK=GP2  MOSI=GP3  MISO=GP4  CS=GP5
@@ -665,30 +871,124 @@ TOUCH_MAP = [
     (board.GP17, f"{SOUNDS_DIR}/Tip5.wav",    "Tip5"),
 ]
 
-touch_inputs = []
-for pin, _, _ in TOUCH_MAP:
-    t = digitalio.DigitalInOut(pin)
-    t.direction = digitalio.Direction.INPUT
-    t.pull = digitalio.Pull.DOWN
-    touch_inputs.append(t)
-
-# Debounce state per pad
-touch_high_since = [0.0] * len(touch_inputs)   # monotonic time pin went HIGH
-touch_triggered  = [False] * len(touch_inputs)  # already fired this press?
+_TOUCH_PINS = tuple(pin for pin, _, _ in TOUCH_MAP)
+# Flat per-pad tables, so a touch is plain indexing
+_TOUCH_WAVS = tuple(path for _, path, _ in TOUCH_MAP)
+_TOUCH_EXPRS = (tuple(TOUCH_EXPR[:len(TOUCH_MAP)])
+                + (None,) * (len(TOUCH_MAP) - len(TOUCH_EXPR)))
+
+# keypad scans the pads in the background (in C) and queues one event
+# per press/release edge.  Pads idle LOW (pull-down).
+def _make_touch_keys():
+    return keypad.Keys(
+        _TOUCH_PINS,
+        value_when_pressed=True,
+        pull=True,
+        interval=TOUCH_SCAN_MS / 1000,
+    )
+
+touch_keys = _make_touch_keys()
+_touch_event = keypad.Event()     # reused by get_into(), no per-poll allocation
+
+# Only the release edge is debounced: a press fires on the first scan that
+# sees it, and released pads (bit i = pad i) ignore presses until the
+# re-arm time after the latest release.
+_rearm_mask = 0
+_rearm_until_ms = 0
+_cooldown_until_ms = 0            # 0 = no cooldown running
+
+# Pads held down, from press/release events.  A rebuilt scanner (every
+# light-sleep nap) reports a pad already held as a fresh press; with
+# RELEASE_REQUIRED those presses are dropped (_stale_mask) until the new
+# scanner has had a few scans to report them.
+_held_mask = 0
+_stale_mask = 0
+_stale_until_ms = 0
+_pending_fire = 0   # presses drained before a nap, handed to the next drain
+
+def _ticks_ms():
+    return time.monotonic_ns() // 1_000_000
+
+def _drain_touches(now_ms):
+    """Apply queued touch events to the pad state; return the mask of
+    presses allowed to fire."""
+    global _rearm_mask, _rearm_until_ms, _held_mask, _stale_mask, _pending_fire
+    if _rearm_mask and now_ms >= _rearm_until_ms:
+        _rearm_mask = 0
+    fire = _pending_fire
+    _pending_fire = 0
+    while touch_keys.events.get_into(_touch_event):
+        bit = 1 << _touch_event.key_number
+        if _touch_event.pressed:
+            _held_mask |= bit
+            if bit & _stale_mask:
+                _stale_mask &= ~bit       # held since before the rebuild
+            else:
+                fire |= bit & ~_rearm_mask
+        else:
+            _held_mask &= ~bit
+            _rearm_mask |= bit
+            _rearm_until_ms = now_ms + TOUCH_DEBOUNCE_MS
+    if _stale_mask and now_ms >= _stale_until_ms:
+        _stale_mask = 0                   # not reported: let go during the nap
+    return fire
+
+def _next_touch(now_ms):
+    """Drain touch events; return the lowest pad allowed to fire, or None."""
+    fire = _drain_touches(now_ms)
+    if not fire or now_ms < _cooldown_until_ms:
+        return None
+    i = 0
+    while not (fire >> i) & 1:
+        i += 1
+    return i
 
 # =========================================================
 # State
 # =========================================================
+# One handler per state in the main loop.  A critical battery isn't a
+# state: power_off() never returns.
+ST_DISARMED = 0                   # awake; waiting for the I/O button
+ST_ARMED = 1                      # touch pads play sounds
+ST_SLEEPING = 2                   # sleeping face, backlight pulsing
+
+state = ST_DISARMED
 last_activity = time.monotonic()
-sleeping = False
-armed = False
 _sleep_start = 0.0
-_bat_flash_on = False
-_bat_flash_t = 0.0
+_bat_flash_on = False             # warning currently shown on row 3
+_bat_flash_deadline = 0.0         # next warning on/off toggle
 
 # =========================================================
 # Audio helpers
 # =========================================================
+# Touch and start-button sounds stay open from boot so playback skips
+# the SD directory walk; replaying a WaveFile restarts it from the top.
+_WAV_CACHE = {}
+_wav_files = []                   # keeps the cached file handles alive
+
+def _prefetch_wavs():
+    for path in _TOUCH_WAVS + (START_WAV,):
+        try:
+            f = open(path, "rb")
+        except OSError:
+            continue              # play_wav reports it as missing
+        _wav_files.append(f)
+        _WAV_CACHE[path] = audiocore.WaveFile(f)
+
+def _wait_playing(label, allow_start_interrupt, expr):
+    # The face only changes at eye-animation boundaries, so redraw then and
+    # otherwise just sleep (<= 50 ms keeps the I/O button responsive).
+    next_frame = 0.0
+    while audio.playing:
+        if allow_start_interrupt and io_press_pending():
+            audio.stop()
+            break
+        t = time.monotonic()
+        if t >= next_frame:
+            lcd_playing(label, expr=expr)
+            next_frame = _next_eye_change(t)
+        time.sleep(min(0.05, max(0.005, next_frame - t)))
+
 def play_wav(path, label, allow_start_interrupt=True, expr=None):
     global last_activity
     last_activity = time.monotonic()
@@ -699,35 +999,125 @@ def play_wav(path, label, allow_start_interrupt=True, expr=None):
 
     lcd_playing(label, expr=expr)
 
-    amp_en.value = True
+    _set_amp(True)
     time.sleep(0.15)
 
     try:
-        with open(path, "rb") as f:
-            wav = audiocore.WaveFile(f)
+        wav = _WAV_CACHE.get(path)
+        if wav is not None:
             audio.play(wav)
-            while audio.playing:
-                if allow_start_interrupt and start_pressed():
-                    audio.stop()
-                    break
-                lcd_playing(label, expr=expr)
-                time.sleep(0.01)
+            _wait_playing(label, allow_start_interrupt, expr)
+        else:
+            with open(path, "rb") as f:
+                audio.play(audiocore.WaveFile(f))
+                _wait_playing(label, allow_start_interrupt, expr)
     except OSError:
-        amp_en.value = False
+        _set_amp(False)
         lcd_missing(path.split("/")[-1])
         time.sleep(1.2)
         return
 
     audio.stop()
     time.sleep(0.15)
-    amp_en.value = False
+    _set_amp(False)
 
 def play_start_button_sound():
     while start_pressed():
         time.sleep(0.01)
     time.sleep(0.05)
-    play_wav(f"{SOUNDS_DIR}/StartButton.wav",
-             "Start Button", allow_start_interrupt=False)
+    play_wav(START_WAV, "Start Button", allow_start_interrupt=False)
+
+# =========================================================
+# Idle light-sleep
+# Between redraws the core naps in light sleep instead of polling.
+# The I/O button, a touch pad or the next redraw deadline wakes it.
+# =========================================================
+_NAP_MIN_S = 0.02                 # not worth sleeping for less than this
+_TICK_SLOP = 0.01
+_nap_hold_until = 0.0             # stay awake so keypad can see a woken pad
+
+def _next_idle_deadline(now, bat_flashing=False):
+    """Earliest monotonic time at which the idle screen or the sleep
+    timer needs attention."""
+    # The countdown shows int(remaining), which changes just after
+    # remaining crosses a whole second; _TICK_SLOP lands past that edge.
+    remaining = SLEEP_AFTER_S - (now - last_activity)
+    if remaining > COUNTDOWN_SHOW_S:
+        deadline = min(_next_eye_change(now),
+                       _chatter_t + IDLE_CHATTER_S,
+                       now + remaining - COUNTDOWN_SHOW_S)
+    elif remaining > COUNTDOWN_DIM_S:
+        deadline = now + remaining % 1.0 + _TICK_SLOP       # next second
+    elif remaining >= COUNTDOWN_DARK_S:
+        secs = int(remaining)
+        shown_next = secs - (secs % 5 or 5)                  # next multiple of 5
+        deadline = now + min(remaining - (shown_next + 1),
+                             remaining - COUNTDOWN_DARK_S) + _TICK_SLOP
+    else:
+        deadline = now + remaining + _TICK_SLOP               # dark until sleep
+    deadline = min(deadline, _bat_last_read + BAT_UPDATE_S)
+    if bat_flashing:
+        deadline = min(deadline, _bat_flash_deadline)
+    return deadline
+
+def _light_sleep_until(deadline, touch_wake=True):
+    """Light-sleep until *deadline* or until the I/O button (and, if
+    *touch_wake*, any touch pad) is pressed.  The pins are handed to
+    PinAlarm for the nap and reclaimed afterwards.  Returns the alarm
+    that woke us, or None if a press came in before the nap started.
+
+    Rebuilding both keypad scanners allocates a little on every nap.
+    Naps come at most a few times a second, and the light sleep saves
+    far more than the extra collections cost, so that is accepted."""
+    global touch_keys, io_keys, _io_down, _held_mask, _stale_mask, _stale_until_ms
+    global _pending_fire
+    # Keep releases the deinit would drop.  While touches count, a press
+    # queued since the caller checked is kept for _next_touch and the nap
+    # skipped: its pad is held, so no rising edge would wake us.
+    fire = _drain_touches(_ticks_ms())
+    if fire and touch_wake:
+        _pending_fire = fire
+        return None
+    if io_press_pending():            # queued since the caller checked
+        return None
+    touch_keys.deinit()
+    io_keys.deinit()
+    alarms = [alarm.time.TimeAlarm(monotonic_time=deadline),
+              alarm.pin.PinAlarm(board.GP21, value=False, edge=True, pull=True)]
+    if touch_wake:
+        for pin in _TOUCH_PINS:
+            alarms.append(alarm.pin.PinAlarm(pin, value=True, edge=True, pull=True))
+    woke = alarm.light_sleep_until_alarms(*alarms)
+    io_keys = _make_io_keys()
+    _io_down = False                  # a held button re-reports as pressed
+    touch_keys = _make_touch_keys()
+    # Held pads will re-report as pressed; don't let that retrigger them.
+    # A pad whose rising edge woke us is a genuinely new press.
+    held = _held_mask | _stale_mask
+    if isinstance(woke, alarm.pin.PinAlarm) and woke.pin in _TOUCH_PINS:
+        held &= ~(1 << _TOUCH_PINS.index(woke.pin))
+    _held_mask = 0
+    _stale_mask = held if RELEASE_REQUIRED else 0
+    _stale_until_ms = _ticks_ms() + 3 * TOUCH_SCAN_MS
+    return woke
+
+def _idle_nap(now, touch_wake=True, bat_flashing=False):
+    """Nap until the next idle deadline unless something is pending."""
+    if now < _nap_hold_until or len(touch_keys.events) or io_press_pending():
+        return
+    deadline = _next_idle_deadline(now, bat_flashing)
+    if _cooldown_until_ms:
+        deadline = min(deadline, _cooldown_until_ms / 1000)
+    if deadline - now < _NAP_MIN_S:
+        return
+    _hold_after_pin_wake(_light_sleep_until(deadline, touch_wake))
+
+def _hold_after_pin_wake(woke):
+    """After a pin wake, stay awake long enough for the fresh keypad
+    scanners to report the pad or button that woke us."""
+    global _nap_hold_until
+    if isinstance(woke, alarm.pin.PinAlarm):
+        _nap_hold_until = time.monotonic() + 3 * TOUCH_SCAN_MS / 1000
 
 # =========================================================
 # Sleep / Wake
@@ -742,27 +1132,25 @@ def _set_backlight(on):
     _write_byte(0x00)   # all data/control lines stay low; only BL bit changes
 
 def go_to_sleep():
-    global sleeping, armed, last_activity, _sleep_start
-    armed = False
-    amp_en.value = False
+    global state, last_activity, _sleep_start
+    state = ST_DISARMED
+    _set_amp(False)
     _save_interaction_count()       # persist count before sleeping
     lcd_sleeping_face()             # closed eyes + Zzz + Press I/O
     time.sleep(SLEEP_MESSAGE_S)
-    sleeping = True
-    _sleep_start = time.monotonic()
-    last_activity = time.monotonic()
+    state = ST_SLEEPING
+    _sleep_start = last_activity = time.monotonic()
 
 def wake_up():
-    global sleeping, last_activity, armed
+    global state, last_activity
     _set_backlight(True)
     lcd_reset()                     # hard reset prevents garbled characters
-    sleeping = False
     last_activity = time.monotonic()
     _reset_chatter()
     lcd_boot()
     _play_boot_sound()
     play_start_button_sound()
-    armed = True
+    state = ST_ARMED
     _reset_eye_anim()
     lcd_idle_armed()
 
@@ -774,7 +1162,7 @@ def wake_up():
 def power_off():
     """Shut down peripherals and enter deep sleep."""
     _save_interaction_count()       # persist count before power off
-    amp_en.value = False
+    _set_amp(False)
     if audio.playing:
         audio.stop()
     lcd_show("Powering off...", "", center=True)
@@ -788,9 +1176,100 @@ def power_off():
     time.sleep(0.1)
 
     # Deep sleep until I/O button is pressed again (GP21 goes LOW)
+    io_keys.deinit()
+    touch_keys.deinit()
     pin_alarm = alarm.pin.PinAlarm(pin=board.GP21, value=False, pull=True)
     alarm.exit_and_deep_sleep_until_alarms(pin_alarm)
 
+# =========================================================
+# State handlers (one main-loop pass each)
+# =========================================================
+def _on_io_press(now):
+    """Short press wakes or arms; holding POWER_OFF_HOLD_S powers off."""
+    global state, last_activity
+    power_off_at = now + POWER_OFF_HOLD_S
+    while start_pressed():
+        if time.monotonic() >= power_off_at:
+            power_off()      # does not return; board resets on wake
+        time.sleep(0.01)
+
+    # short press — released before POWER_OFF_HOLD_S
+    last_activity = time.monotonic()
+    _reset_chatter()
+    if state == ST_SLEEPING:
+        wake_up()
+    else:
+        play_start_button_sound()
+        state = ST_ARMED
+        _reset_eye_anim()
+        lcd_idle_armed()
+    _drain_touches(_ticks_ms())   # drop touches queued while not armed
+    time.sleep(0.2)
+
+def _tick_sleeping(now, remaining, bat_level):
+    on_s = SLEEP_PULSE_S * 0.4               # 40 % on, 60 % off
+    cycle = (now - _sleep_start) % SLEEP_PULSE_S
+    bl_on = cycle < on_s
+    _set_backlight(bl_on)
+    # nap until the next flip; only the I/O button wakes us early, and
+    # then io_keys must scan before the next nap or the press is lost
+    flip = now + (on_s if bl_on else SLEEP_PULSE_S) - cycle
+    if flip - now >= _NAP_MIN_S and now >= _nap_hold_until:
+        _hold_after_pin_wake(_light_sleep_until(flip, touch_wake=False))
+    else:
+        time.sleep(0.01)
+
+def _tick_armed(now, remaining, bat_level):
+    global last_activity, _cooldown_until_ms
+    if audio.playing:
+        time.sleep(0.01)
+        return
+    now_ms = _ticks_ms()
+    if _cooldown_until_ms and now_ms >= _cooldown_until_ms:
+        _cooldown_until_ms = 0
+        if not RELEASE_REQUIRED:
+            touch_keys.reset()    # pads still held report a fresh press
+    i = _next_touch(now_ms)
+    if i is not None:
+        last_activity = now
+        _reset_chatter()
+        _increment_interaction()
+
+        # Easter egg check
+        if _check_easter_egg(i):
+            # skip normal playback
+            pass
+        else:
+            play_wav(_TOUCH_WAVS[i], _pick(),
+                     allow_start_interrupt=True, expr=_TOUCH_EXPRS[i])
+
+        # Milestone check
+        _check_milestone()
+
+        # Forget touches queued during playback, then ignore presses until
+        # the cooldown ends (checked above; the loop keeps running).  A pad
+        # still held only fires again once released (keypad reports edges).
+        _drain_touches(_ticks_ms())
+        _cooldown_until_ms = _ticks_ms() + COOLDOWN_MS
+        now = time.monotonic()        # playback took a while
+        remaining = SLEEP_AFTER_S - (now - last_activity)
+
+    # refresh idle display (battery + countdown)
+    lcd_idle_armed(countdown_s=max(0, remaining), now=now)
+    _idle_nap(now, bat_flashing=(bat_level == "low"))
+    time.sleep(0.01)
+
+def _tick_disarmed(now, remaining, bat_level):
+    # touches don't count while disarmed
+    _drain_touches(_ticks_ms())
+
+    # refresh disarmed display (battery + countdown)
+    lcd_idle_disarmed(countdown_s=max(0, remaining), now=now)
+    _idle_nap(now, touch_wake=False, bat_flashing=(bat_level == "low"))
+    time.sleep(0.01)
+
+_STATE_TICK = (_tick_disarmed, _tick_armed, _tick_sleeping)
+
 # =========================================================
 # MAIN LOOP
 # =========================================================
@@ -801,6 +1280,7 @@ lcd_reset()
 _load_interaction_count()
 
 lcd_boot()
+_prefetch_wavs()
 
 # Show interaction count on boot
 if _interaction_count > 0:
@@ -817,118 +1297,32 @@ while True:
     remaining = SLEEP_AFTER_S - (now - last_activity)
 
     # ---- Low battery check ----
-    bat_level = _check_low_battery()
+    bat_level = _check_low_battery(now)
     if bat_level == "critical":
         _save_interaction_count()
         power_off()
-    elif bat_level == "low" and not sleeping:
-        # Flash warning on row 3 without full redraw
-        if (now - _bat_flash_t) >= 2.0:
+    elif (bat_level == "low" and state != ST_SLEEPING
+            and not _display_dark):
+        # Flash the warning on row 3.  The idle redraw owns that row and
+        # composes it, so just toggle and force the next refresh.
+        if now >= _bat_flash_deadline:
+            _bat_flash_deadline = now + 2.0
             _bat_flash_on = not _bat_flash_on
-            _bat_flash_t = now
-            lcd_set_cursor(3, 0)
-            if _bat_flash_on:
-                lcd_print(_fit_line("!! Low Battery !!", LCD_COLS, center=True))
-            else:
-                lcd_print(_fit_line("", LCD_COLS))
+            _next_refresh = 0.0
+    elif _bat_flash_on:
+        # Not flashing now (battery recovered, sleeping or display dark):
+        # drop the warning so it isn't left on screen
+        _bat_flash_on = False
+        _next_refresh = 0.0
 
     # ---- I/O button: wait in place to distinguish short vs long press ----
-    if start_pressed():
-        press_start = time.monotonic()
-        long_pressed = False
-        while start_pressed():
-            if (time.monotonic() - press_start) >= POWER_OFF_HOLD_S:
-                long_pressed = True
-                power_off()      # does not return; board resets on wake
-            time.sleep(0.01)
-
-        # short press — released before 5 s
-        if not long_pressed:
-            last_activity = time.monotonic()
-            _reset_chatter()
-            if sleeping:
-                wake_up()
-            else:
-                play_start_button_sound()
-                armed = True
-                _reset_eye_anim()
-                lcd_idle_armed()
-            time.sleep(0.2)
-            continue
+    if take_io_press():
+        _on_io_press(now)
+        continue
 
     # ---- enter sleep after inactivity ----
-    if not sleeping and remaining <= 0:
+    if state != ST_SLEEPING and remaining <= 0:
         go_to_sleep()
         continue
 
-    # ---- sleeping: pulse backlight ----
-    if sleeping:
-        cycle = (now - _sleep_start) % SLEEP_PULSE_S
-        bl_on = cycle < (SLEEP_PULSE_S * 0.4)   # 40 % on, 60 % off
-        _set_backlight(bl_on)
-        time.sleep(0.05)
-        continue
-
-    # ---- Touch pads (armed only) ----
-    if armed and not audio.playing:
-        for i, (_, wav_path, label) in enumerate(TOUCH_MAP):
-            current = touch_inputs[i].value
-
-            if current and not touch_triggered[i]:
-                # pin is HIGH — start or continue debounce window
-                if touch_high_since[i] == 0.0:
-                    touch_high_since[i] = now
-                elif (now - touch_high_since[i]) >= (TOUCH_DEBOUNCE_MS / 1000):
-                    # debounce passed — fire
-                    touch_triggered[i] = True
-                    last_activity = time.monotonic()
-                    _reset_chatter()
-                    _increment_interaction()
-
-                    # Easter egg check
-                    if _check_easter_egg(i):
-                        # skip normal playback
-                        pass
-                    else:
-                        msg = random.choice(CLIMATE_MSGS)
-                        pad_expr = TOUCH_EXPR[i] if i < len(TOUCH_EXPR) else None
-                        play_wav(wav_path, msg,
-                                 allow_start_interrupt=True, expr=pad_expr)
-
-                    # Milestone check
-                    _check_milestone()
-
-                    # wait for release
-                    if RELEASE_REQUIRED:
-                        t0 = time.monotonic()
-                        while touch_inputs[i].value:
-                            if time.monotonic() - t0 > 5.0:
-                                break
-                            time.sleep(0.01)
-
-                    # cooldown
-                    t1 = time.monotonic()
-                    while time.monotonic() - t1 < COOLDOWN_S:
-                        time.sleep(0.01)
-                    break   # re-scan from the top next iteration
-
-            if not current:
-                touch_high_since[i] = 0.0
-                touch_triggered[i] = False
-
-        # refresh idle display (battery + countdown)
-        now2 = time.monotonic()
-        rem2 = SLEEP_AFTER_S - (now2 - last_activity)
-        lcd_idle_armed(countdown_s=max(0, rem2))
-
-    elif not armed and not sleeping:
-        # keep debounce state clean while disarmed
-        for i in range(len(touch_inputs)):
-            if not touch_inputs[i].value:
-                touch_high_since[i] = 0.0
-                touch_triggered[i] = False
-
-        # refresh disarmed display (battery + countdown)
-        lcd_idle_disarmed(countdown_s=max(0, remaining))
-
-    time.sleep(0.01)
+    _STATE_TICK[state](now, remaining, bat_level)
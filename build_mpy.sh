@@ -0,0 +1,20 @@
+#!/bin/sh
+# Precompile the Pico script to .mpy so the board skips parsing and
+# compiling ~1000 lines of source on every boot.
+#
+#   ./build_mpy.sh [/path/to/CIRCUITPY]
+#
+# mpy-cross must match the CircuitPython release on the board.
+# CircuitPython only auto-runs code.py, so a one-line stub imports the
+# .mpy; remove any DMART_pico_code_v2.py copy from the board, since the
+# source is found before the .mpy.
+set -e
+cd "$(dirname "$0")"
+OUT=build
+mkdir -p "$OUT"
+# -O3 drops asserts and line-number info
+mpy-cross -O3 -o "$OUT/DMART_pico_code_v2.mpy" DMART_pico_code_v2.py
+echo "import DMART_pico_code_v2" > "$OUT/code.py"
+if [ -n "$1" ]; then
+    cp "$OUT/DMART_pico_code_v2.mpy" "$OUT/code.py" "$1/"
+fi
@@ -5,19 +5,28 @@ Uses: OLED faces, TFT text, Groq Whisper/LLM, Claude Vision, CSI Camera, Piezo b
 WITH CONVERSATION MEMORY!
 """
 
+import io
 import os
+import queue
+import re
+import struct
+import textwrap
+import threading
 import time
 import base64
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import httpx
+import numpy as np
 import RPi.GPIO as GPIO
 from groq import Groq
 from anthropic import Anthropic
 import sounddevice as sd
-import scipy.io.wavfile as wav
 from st7789 import ST7789
 from PIL import Image, ImageDraw, ImageFont
 from picamera2 import Picamera2
 from luma.core.interface.serial import i2c
-from luma.core.render import canvas
 from luma.oled.device import ssd1306
 
 # Initialize displays
@@ -40,13 +49,27 @@ oled = ssd1306(serial)
 # Initialize CSI camera
 print("Initializing camera...")
 picam = Picamera2()
-picam.configure(picam.create_still_configuration())
+# Photos only feed the vision model and the 320x240 TFT, so capture small:
+# 512x384 at JPEG quality 75 is a fraction of the full-sensor upload.
+picam.configure(picam.create_still_configuration(main={"size": (512, 384)}))
+picam.options["quality"] = 75
 picam.start()
 time.sleep(2)
 
 # Initialize APIs
-groq_client = Groq(api_key=os.environ.get("GROQ_API_KEY"))
-claude_client = Anthropic(api_key=os.environ.get("ANTHROPIC_API_KEY"))
+# One keep-alive client for both APIs, so each turn reuses the TLS
+# connection instead of handshaking again.  HTTP/2 if h2 is installed.
+_http_limits = httpx.Limits(max_keepalive_connections=4, keepalive_expiry=300)
+try:
+    http_client = httpx.Client(http2=True, limits=_http_limits, timeout=30)
+except ImportError:
+    http_client = httpx.Client(limits=_http_limits, timeout=30)
+
+groq_client = Groq(api_key=os.environ.get("GROQ_API_KEY"), http_client=http_client)
+claude_client = Anthropic(api_key=os.environ.get("ANTHROPIC_API_KEY"), http_client=http_client)
+
+# Background work (camera capture, network) that overlaps the UI
+executor = ThreadPoolExecutor(max_workers=2)
 
 # Setup GPIO
 GPIO.setmode(GPIO.BCM)
@@ -55,15 +78,26 @@ GPIO.setmode(GPIO.BCM)
 BUTTON_PIN = 17
 GPIO.setup(BUTTON_PIN, GPIO.IN, pull_up_down=GPIO.PUD_UP)
 
+# Button edges are queued from RPi.GPIO's edge thread as their
+# time.monotonic() stamp so waiting code can block instead of polling.
+# The callback runs while the contact may still be bouncing, so the pin
+# level is read by the waiter once it has settled, not here.
+button_events = queue.Queue()
+
+def _on_button(channel):
+    button_events.put(time.monotonic())
+
+GPIO.add_event_detect(BUTTON_PIN, GPIO.BOTH, callback=_on_button, bouncetime=20)
+
 # Setup piezo
 BUZZER_PIN = 13
 GPIO.setup(BUZZER_PIN, GPIO.OUT)
 buzzer = GPIO.PWM(BUZZER_PIN, 440)
 
 # Idle timer and conversation memory
-last_interaction_time = time.time()
+last_interaction_time = time.monotonic()
 SLEEPY_TIMEOUT = 60  # Increased to 60 seconds
-conversation_history = []
+conversation_history = deque(maxlen=20)  # last 20 messages; oldest drop off
 
 # Personality definitions
 PERSONALITIES = [
@@ -138,422 +172,702 @@ buddy_name = "Classroom Buddy"
 user_name = "friend"
 
 
+# (kid_prompt, adult_prompt) per personality, indexed by adult_mode
+SYSTEM_PROMPTS = tuple((p["kid_prompt"], p["adult_prompt"]) for p in PERSONALITIES)
+
+
+VISION_GUIDELINES = """
+
+Additional guidelines for vision:
+- Describe what you see clearly
+- Keep responses SHORT (2-3 sentences max)"""
+
+
+@lru_cache(maxsize=16)
+def _system_prompt(personality, adult, buddy, user):
+    base = SYSTEM_PROMPTS[personality][adult]
+    return f"{base}\n\nYour name is {buddy}. The user's name is {user}. Use their name naturally in conversation."
+
+
 def get_system_prompt():
     """Return the active system prompt based on personality and mode."""
-    p = PERSONALITIES[current_personality]
-    base = p["adult_prompt"] if adult_mode else p["kid_prompt"]
-    return f"{base}\n\nYour name is {buddy_name}. The user's name is {user_name}. Use their name naturally in conversation."
+    return _system_prompt(current_personality, adult_mode, buddy_name, user_name)
 
 
-def check_voice_command(text):
-    """Check if transcribed text is a voice command. Returns True if command detected."""
-    global current_personality, adult_mode
-    t = text.lower().strip()
+def _set_adult_mode(on):
+    global adult_mode
+    adult_mode = on
+    p_name = PERSONALITIES[current_personality]["name"]
+    label = "ADULT" if on else "KID"
+    print(f"COMMAND: {label.capitalize()} mode ON ({p_name})")
+    beep_happy()
+    tft_write_lines([
+        "Mode Changed!",
+        f"{label} MODE: ON",
+        f"{p_name}",
+        ""
+    ])
+    time.sleep(2)
 
-    if "adult mode" in t:
-        adult_mode = True
-        p_name = PERSONALITIES[current_personality]["name"]
-        print(f"COMMAND: Adult mode ON ({p_name})")
-        beep_happy()
-        tft_write_lines([
-            "Mode Changed!",
-            "ADULT MODE: ON",
-            f"{p_name}",
-            ""
-        ])
-        time.sleep(2)
-        return True
 
-    if "kid mode" in t:
-        adult_mode = False
-        p_name = PERSONALITIES[current_personality]["name"]
-        print(f"COMMAND: Kid mode ON ({p_name})")
-        beep_happy()
-        tft_write_lines([
-            "Mode Changed!",
-            "KID MODE: ON",
-            f"{p_name}",
-            ""
-        ])
-        time.sleep(2)
-        return True
+def _set_personality(index):
+    global current_personality
+    current_personality = index
+    p_name = PERSONALITIES[index]["name"]
+    mode = "ADULT" if adult_mode else "KID"
+    print(f"COMMAND: Personality -> {p_name} ({mode})")
+    beep_happy()
+    tft_write_lines([
+        "Personality:",
+        p_name,
+        f"Mode: {mode}",
+        ""
+    ])
+    time.sleep(2)
 
-    if "personality teacher" in t:
-        current_personality = 0
-        mode = "ADULT" if adult_mode else "KID"
-        print(f"COMMAND: Personality -> Friendly Teacher ({mode})")
-        beep_happy()
-        tft_write_lines([
-            "Personality:",
-            "Friendly Teacher",
-            f"Mode: {mode}",
-            ""
-        ])
-        time.sleep(2)
-        return True
 
-    if "personality comedian" in t:
-        current_personality = 1
-        mode = "ADULT" if adult_mode else "KID"
-        print(f"COMMAND: Personality -> Sarcastic Comedian ({mode})")
+def _show_last_photo():
+    if os.path.exists("photo.jpg"):
+        print("COMMAND: Showing last photo")
         beep_happy()
+        photo = Image.open("photo.jpg")
+        photo = photo.resize((320, 240))
+        tft_show_image(photo)
+        time.sleep(5)
+    else:
+        print("COMMAND: No photo to show")
+        beep_confused()
         tft_write_lines([
-            "Personality:",
-            "Sarcastic Comedian",
-            f"Mode: {mode}",
-            ""
+            "No photo yet!",
+            "",
+            "Long press to",
+            "take a photo first"
         ])
-        time.sleep(2)
-        return True
+        time.sleep(3)
 
-    if "show" in t and "picture" in t or "show" in t and "photo" in t:
-        if os.path.exists("photo.jpg"):
-            print("COMMAND: Showing last photo")
-            beep_happy()
-            photo = Image.open("photo.jpg")
-            photo = photo.resize((320, 240))
-            tft.display(photo)
-            time.sleep(5)
-        else:
-            print("COMMAND: No photo to show")
-            beep_confused()
-            tft_write_lines([
-                "No photo yet!",
-                "",
-                "Long press to",
-                "take a photo first"
-            ])
-            time.sleep(3)
-        return True
 
-    if "go to sleep" in t or "sleep mode" in t:
-        print("COMMAND: Sleep mode")
-        beep_sleepy()
-        draw_sleepy_face()
-        tft_write_lines([
-            f"Goodnight,",
-            f"{user_name}!",
-            "",
-            "Press button",
-            "to wake me up"
-        ])
-        time.sleep(2)
-        # Turn off TFT (black screen)
-        tft.display(Image.new('RGB', (320, 240), 'black'))
-        oled.hide()
-        # Wait for button press to wake up
-        while GPIO.input(BUTTON_PIN) == GPIO.HIGH:
-            time.sleep(0.1)
-        # Debounce - wait for release
-        while GPIO.input(BUTTON_PIN) == GPIO.LOW:
-            time.sleep(0.1)
-        time.sleep(0.2)
-        # Wake up
-        oled.show()
-        beep_startup()
-        draw_idle_face()
-        tft_write_lines([
-            f"Good morning,",
-            f"{user_name}!",
-            "",
-            "Press button!"
-        ])
-        return True
+def _sleep_mode():
+    print("COMMAND: Sleep mode")
+    beep_sleepy()
+    draw_sleepy_face()
+    tft_write_lines([
+        f"Goodnight,",
+        f"{user_name}!",
+        "",
+        "Press button",
+        "to wake me up"
+    ])
+    time.sleep(2)
+    # Turn off TFT (black screen)
+    tft_write_lines([])
+    oled.hide()
+    # Wait for button press (and release) to wake up
+    wait_for_click()
+    # Wake up
+    oled.show()
+    beep_startup()
+    draw_idle_face()
+    tft_write_lines([
+        f"Good morning,",
+        f"{user_name}!",
+        "",
+        "Press button!"
+    ])
 
-    if "personality chill" in t:
-        current_personality = 2
-        mode = "ADULT" if adult_mode else "KID"
-        print(f"COMMAND: Personality -> Chill Tutor ({mode})")
-        beep_happy()
-        tft_write_lines([
-            "Personality:",
-            "Chill Tutor",
-            f"Mode: {mode}",
-            ""
-        ])
-        time.sleep(2)
-        return True
 
+# Every command keyword, found in one pass over the transcription
+COMMAND_KEYWORDS = {
+    "adult mode": "adult",
+    "kid mode": "kid",
+    "personality teacher": "teacher",
+    "personality comedian": "comedian",
+    "personality chill": "chill",
+    "go to sleep": "sleep",
+    "sleep mode": "sleep",
+    "show": "show",
+    "picture": "photo",
+    "photo": "photo",
+}
+_COMMAND_RE = re.compile("|".join(map(re.escape, COMMAND_KEYWORDS)))
+
+# Checked in this order; the first command present wins
+COMMANDS = (
+    ("adult", lambda: _set_adult_mode(True)),
+    ("kid", lambda: _set_adult_mode(False)),
+    ("teacher", lambda: _set_personality(0)),
+    ("comedian", lambda: _set_personality(1)),
+    ("show photo", _show_last_photo),
+    ("sleep", _sleep_mode),
+    ("chill", lambda: _set_personality(2)),
+)
+
+
+def check_voice_command(text):
+    """Check if transcribed text is a voice command. Returns True if command detected."""
+    found = {COMMAND_KEYWORDS[m.group()]
+             for m in _COMMAND_RE.finditer(text.lower())}
+    if not found:
+        return False
+    if "show" in found and "photo" in found:
+        found.add("show photo")
+    for key, handler in COMMANDS:
+        if key in found:
+            handler()
+            return True
     return False
 
 
 # Piezo Sound Functions
+# Tone sequences as (duty %, ((freq_hz, duration_ms), ...)).
+BEEP_STARTUP = (50, ((262, 150), (330, 150), (392, 150), (523, 150)))
+BEEP_BUTTON = (50, ((800, 50),))
+BEEP_LISTENING = (50, ((1000, 100), (1200, 100)))
+BEEP_THINKING = (30, ((400, 200), (500, 200)) * 3)
+BEEP_HAPPY = (50, ((523, 100), (659, 100), (784, 100), (1047, 100)))
+BEEP_PHOTO = (50, ((1500, 50), (1200, 50)))
+BEEP_CONFUSED = (40, tuple((f, 120) for f in (500, 600, 500, 700, 500, 650)))
+BEEP_SLEEPY = (30, tuple((f, 80) for f in range(600, 300, -25)))
+BEEP_SAD = (45, tuple((f, 150) for f in (600, 550, 500, 450, 400, 350)))
+
+# A worker thread plays queued sequences so beeping never blocks the caller.
+_beep_queue = queue.Queue()
+
+
+def _beep_worker():
+    while True:
+        duty, tones = _beep_queue.get()
+        buzzer.start(duty)
+        for freq, ms in tones:
+            buzzer.ChangeFrequency(freq)
+            time.sleep(ms / 1000)
+        buzzer.stop()
+        _beep_queue.task_done()
+
+
+threading.Thread(target=_beep_worker, daemon=True).start()
+
+
+def play_beep(sequence):
+    """Queue a tone sequence and return immediately."""
+    _beep_queue.put(sequence)
+
+
+def wait_beeps():
+    """Block until every queued beep has finished playing."""
+    _beep_queue.join()
+
+
 def beep_startup():
-    buzzer.start(50)
-    for freq in [262, 330, 392, 523]:
-        buzzer.ChangeFrequency(freq)
-        time.sleep(0.15)
-    buzzer.stop()
+    play_beep(BEEP_STARTUP)
 
 
 def beep_button():
-    buzzer.start(50)
-    buzzer.ChangeFrequency(800)
-    time.sleep(0.05)
-    buzzer.stop()
+    play_beep(BEEP_BUTTON)
 
 
 def beep_listening():
-    buzzer.start(50)
-    buzzer.ChangeFrequency(1000)
-    time.sleep(0.1)
-    buzzer.ChangeFrequency(1200)
-    time.sleep(0.1)
-    buzzer.stop()
+    play_beep(BEEP_LISTENING)
 
 
 def beep_thinking():
-    buzzer.start(30)
-    for _ in range(3):
-        buzzer.ChangeFrequency(400)
-        time.sleep(0.2)
-        buzzer.ChangeFrequency(500)
-        time.sleep(0.2)
-    buzzer.stop()
+    play_beep(BEEP_THINKING)
 
 
 def beep_happy():
-    buzzer.start(50)
-    for freq in [523, 659, 784, 1047]:
-        buzzer.ChangeFrequency(freq)
-        time.sleep(0.1)
-    buzzer.stop()
+    play_beep(BEEP_HAPPY)
 
 
 def beep_photo():
-    buzzer.start(50)
-    buzzer.ChangeFrequency(1500)
-    time.sleep(0.05)
-    buzzer.ChangeFrequency(1200)
-    time.sleep(0.05)
-    buzzer.stop()
+    play_beep(BEEP_PHOTO)
 
 
 def beep_confused():
-    buzzer.start(40)
-    frequencies = [500, 600, 500, 700, 500, 650]
-    for freq in frequencies:
-        buzzer.ChangeFrequency(freq)
-        time.sleep(0.12)
-    buzzer.stop()
+    play_beep(BEEP_CONFUSED)
 
 
 def beep_sleepy():
-    buzzer.start(30)
-    for freq in range(600, 300, -25):
-        buzzer.ChangeFrequency(freq)
-        time.sleep(0.08)
-    buzzer.stop()
+    play_beep(BEEP_SLEEPY)
 
 
 def beep_sad():
-    buzzer.start(45)
-    frequencies = [600, 550, 500, 450, 400, 350]
-    for freq in frequencies:
-        buzzer.ChangeFrequency(freq)
-        time.sleep(0.15)
-    buzzer.stop()
+    play_beep(BEEP_SAD)
 
 
 def reset_conversation():
-    global conversation_history, current_personality, adult_mode
-    conversation_history = []
+    global current_personality, adult_mode
+    conversation_history.clear()
     current_personality = 0
     adult_mode = False
     print("Conversation reset (kid mode, Friendly Teacher)")
 
 
+BUTTON_RECHECK_S = 0.5  # re-read the pin this often in case an edge was lost
+BUTTON_SETTLE_S = 0.02  # contact bounce window (matches bouncetime)
+
+
+def _wait_button(pressed, timeout=None):
+    """Block until the button goes down (pressed=True) or up.
+
+    Returns the edge's monotonic timestamp, or None after *timeout* seconds.
+    """
+    level = GPIO.LOW if pressed else GPIO.HIGH
+    deadline = None if timeout is None else time.monotonic() + timeout
+    last_edge = None
+    while True:
+        wait = BUTTON_RECHECK_S
+        if deadline is not None:
+            wait = min(wait, deadline - time.monotonic())
+            if wait <= 0:
+                return None
+        try:
+            last_edge = button_events.get(timeout=wait)
+        except queue.Empty:
+            # bouncetime can swallow an edge; the pin itself has the truth
+            if GPIO.input(BUTTON_PIN) == level:
+                return time.monotonic() if last_edge is None else last_edge
+            continue
+        time.sleep(BUTTON_SETTLE_S)
+        if GPIO.input(BUTTON_PIN) == level:
+            _clear_button_events()  # the rest are this edge's bounce
+            return last_edge
+
+
+def _clear_button_events():
+    """Forget edges from presses made while we weren't listening."""
+    while True:
+        try:
+            button_events.get_nowait()
+        except queue.Empty:
+            return
+
+
 def wait_for_button_press():
-    global last_interaction_time, conversation_history
+    global last_interaction_time
     print("Ready! Short press=voice, Long press=photo+voice")
 
+    _clear_button_events()
+    press_start = None
+    if GPIO.input(BUTTON_PIN) == GPIO.LOW:
+        press_start = time.monotonic()
+
     sleepy_shown = False
-    while GPIO.input(BUTTON_PIN) == GPIO.HIGH:
-        # Check for idle timeout while waiting
-        idle_time = time.time() - last_interaction_time
-        if idle_time > SLEEPY_TIMEOUT and not sleepy_shown:
-            draw_sleepy_face()
-            beep_sleepy()
-            tft_write_lines([
-                f"{buddy_name}",
-                "Zzz...",
-                "(press button)"
-            ])
-            reset_conversation()
-            sleepy_shown = True
-            time.sleep(3)
-            draw_idle_face()
-            tft_write_lines([
-                f"{buddy_name}",
-                "",
-                "Press button!"
-            ])
-        time.sleep(0.1)
+    while press_start is None:
+        timeout = None
+        if not sleepy_shown:
+            # Wake up for the idle timeout while waiting
+            timeout = SLEEPY_TIMEOUT - (time.monotonic() - last_interaction_time)
+            if timeout <= 0:
+                draw_sleepy_face()
+                beep_sleepy()
+                tft_write_lines([
+                    f"{buddy_name}",
+                    "Zzz...",
+                    "(press button)"
+                ])
+                reset_conversation()
+                sleepy_shown = True
+                time.sleep(3)
+                draw_idle_face()
+                tft_write_lines([
+                    f"{buddy_name}",
+                    "",
+                    "Press button!"
+                ])
+                continue
+        press_start = _wait_button(True, timeout)
 
-    press_start = time.time()
     print("Button pressed! Hold for photo...")
 
-    while GPIO.input(BUTTON_PIN) == GPIO.LOW:
-        time.sleep(0.1)
-
-    press_duration = time.time() - press_start
+    press_duration = _wait_button(False) - press_start
     time.sleep(0.2)
 
     return press_duration
 
 
-def take_photo(filename="photo.jpg"):
+def wait_for_click():
+    """Block until the button has been pressed and released."""
+    _clear_button_events()
+    if GPIO.input(BUTTON_PIN) == GPIO.HIGH:
+        _wait_button(True)
+    _wait_button(False)
+    time.sleep(0.2)
+
+
+def capture_photo(filename="photo.jpg"):
+    """Capture a JPEG into memory and keep a copy on disk for "show photo".
+    Runs on the executor.  Returns the in-memory JPEG."""
     print("Taking photo...")
-    picam.capture_file(filename)
+    jpeg = io.BytesIO()
+    picam.capture_file(jpeg, format="jpeg")
+    with open(filename, "wb") as f:
+        f.write(jpeg.getbuffer())
     print(f"Photo saved: {filename}")
-    # Show photo on TFT
-    photo = Image.open(filename)
+    return jpeg
+
+
+def show_photo(jpeg):
+    photo = Image.open(jpeg)
     photo = photo.resize((320, 240))
-    tft.display(photo)
-    return filename
+    tft_show_image(photo)
 
 
-def transcribe_audio(audio_file):
-    with open(audio_file, "rb") as file:
-        transcription = groq_client.audio.transcriptions.create(
-            file=(audio_file, file.read()),
-            model="whisper-large-v3",
-            language="en"
-        )
+def transcribe_audio(audio, filename="question.wav"):
+    """Transcribe a WAV file given as bytes or a binary file object."""
+    transcription = groq_client.audio.transcriptions.create(
+        file=(filename, audio),
+        model="whisper-large-v3",
+        language="en"
+    )
     return transcription.text
 
 
 # OLED Face Functions
+# Faces are rasterized once at startup; showing one is a single blit.
+def _render_face(paint):
+    image = Image.new(oled.mode, oled.size)
+    paint(ImageDraw.Draw(image))
+    return image
+
+
+def _paint_idle(draw):
+    draw.rectangle((30, 20, 40, 30), outline="white", fill="white")
+    draw.rectangle((88, 20, 98, 30), outline="white", fill="white")
+    draw.arc((40, 30, 88, 60), 0, 180, fill="white")
+
+
+def _paint_listening(draw):
+    draw.ellipse((25, 15, 45, 35), outline="white", fill="white")
+    draw.ellipse((83, 15, 103, 35), outline="white", fill="white")
+    draw.ellipse((58, 45, 70, 55), outline="white", fill="white")
+
+
+def _paint_thinking(draw):
+    draw.rectangle((30, 15, 40, 25), outline="white", fill="white")
+    draw.rectangle((88, 15, 98, 25), outline="white", fill="white")
+    draw.line((50, 50, 78, 50), fill="white", width=2)
+    draw.ellipse((100, 10, 105, 15), outline="white")
+
+
+def _paint_talking(draw):
+    draw.rectangle((30, 20, 40, 30), outline="white", fill="white")
+    draw.rectangle((88, 20, 98, 30), outline="white", fill="white")
+    draw.ellipse((50, 45, 78, 60), outline="white", fill="white")
+
+
+def _paint_talking_closed(draw):
+    draw.rectangle((30, 20, 40, 30), outline="white", fill="white")
+    draw.rectangle((88, 20, 98, 30), outline="white", fill="white")
+    draw.line((50, 52, 78, 52), fill="white", width=2)
+
+
+def _paint_camera(draw):
+    draw.ellipse((25, 15, 45, 35), outline="white", fill="white")
+    draw.ellipse((83, 15, 103, 35), outline="white", fill="white")
+    draw.ellipse((30, 20, 40, 30), outline="black", fill="black")
+    draw.ellipse((88, 20, 98, 30), outline="black", fill="black")
+    draw.arc((40, 35, 88, 60), 0, 180, fill="white")
+
+
+def _paint_confused(draw):
+    draw.line((25, 25, 35, 20), fill="white", width=3)
+    draw.line((93, 20, 103, 25), fill="white", width=3)
+    draw.arc((45, 45, 65, 60), 180, 360, fill="white")
+    draw.arc((63, 45, 83, 60), 0, 180, fill="white")
+
+
+def _paint_sleepy(draw):
+    draw.arc((25, 20, 45, 35), 180, 360, fill="white")
+    draw.arc((83, 20, 103, 35), 180, 360, fill="white")
+    draw.ellipse((50, 48, 78, 58), outline="white", fill="white")
+    draw.text((105, 10), "z", fill="white")
+    draw.text((110, 15), "Z", fill="white")
+
+
+def _paint_sad(draw):
+    draw.line((25, 25, 30, 20), fill="white", width=3)
+    draw.line((35, 20, 40, 25), fill="white", width=3)
+    draw.line((88, 25, 93, 20), fill="white", width=3)
+    draw.line((98, 20, 103, 25), fill="white", width=3)
+    draw.arc((40, 55, 88, 75), 180, 360, fill="white")
+
+
+FACES = {
+    "idle": _render_face(_paint_idle),
+    "listening": _render_face(_paint_listening),
+    "thinking": _render_face(_paint_thinking),
+    "talking": _render_face(_paint_talking),
+    "talking_closed": _render_face(_paint_talking_closed),
+    "camera": _render_face(_paint_camera),
+    "confused": _render_face(_paint_confused),
+    "sleepy": _render_face(_paint_sleepy),
+    "sad": _render_face(_paint_sad),
+}
+_current_face = None  # name of the face on the OLED
+
+
+def show_face(name):
+    """Blit a pre-rendered face unless it is already showing."""
+    global _current_face
+    if name != _current_face:
+        oled.display(FACES[name])
+        _current_face = name
+
+
 def draw_idle_face():
-    with canvas(oled) as draw:
-        draw.rectangle((30, 20, 40, 30), outline="white", fill="white")
-        draw.rectangle((88, 20, 98, 30), outline="white", fill="white")
-        draw.arc((40, 30, 88, 60), 0, 180, fill="white")
+    show_face("idle")
 
 
 def draw_listening_face():
-    with canvas(oled) as draw:
-        draw.ellipse((25, 15, 45, 35), outline="white", fill="white")
-        draw.ellipse((83, 15, 103, 35), outline="white", fill="white")
-        draw.ellipse((58, 45, 70, 55), outline="white", fill="white")
+    show_face("listening")
 
 
 def draw_thinking_face():
-    with canvas(oled) as draw:
-        draw.rectangle((30, 15, 40, 25), outline="white", fill="white")
-        draw.rectangle((88, 15, 98, 25), outline="white", fill="white")
-        draw.line((50, 50, 78, 50), fill="white", width=2)
-        draw.ellipse((100, 10, 105, 15), outline="white")
+    show_face("thinking")
 
 
 def draw_talking_face():
-    with canvas(oled) as draw:
-        draw.rectangle((30, 20, 40, 30), outline="white", fill="white")
-        draw.rectangle((88, 20, 98, 30), outline="white", fill="white")
-        draw.ellipse((50, 45, 78, 60), outline="white", fill="white")
+    show_face("talking")
 
 
 def draw_talking_mouth_closed():
-    with canvas(oled) as draw:
-        draw.rectangle((30, 20, 40, 30), outline="white", fill="white")
-        draw.rectangle((88, 20, 98, 30), outline="white", fill="white")
-        draw.line((50, 52, 78, 52), fill="white", width=2)
+    show_face("talking_closed")
 
 
 def draw_camera_face():
-    with canvas(oled) as draw:
-        draw.ellipse((25, 15, 45, 35), outline="white", fill="white")
-        draw.ellipse((83, 15, 103, 35), outline="white", fill="white")
-        draw.ellipse((30, 20, 40, 30), outline="black", fill="black")
-        draw.ellipse((88, 20, 98, 30), outline="black", fill="black")
-        draw.arc((40, 35, 88, 60), 0, 180, fill="white")
+    show_face("camera")
 
 
 def draw_confused_face():
-    with canvas(oled) as draw:
-        draw.line((25, 25, 35, 20), fill="white", width=3)
-        draw.line((93, 20, 103, 25), fill="white", width=3)
-        draw.arc((45, 45, 65, 60), 180, 360, fill="white")
-        draw.arc((63, 45, 83, 60), 0, 180, fill="white")
+    show_face("confused")
 
 
 def draw_sleepy_face():
-    with canvas(oled) as draw:
-        draw.arc((25, 20, 45, 35), 180, 360, fill="white")
-        draw.arc((83, 20, 103, 35), 180, 360, fill="white")
-        draw.ellipse((50, 48, 78, 58), outline="white", fill="white")
-        draw.text((105, 10), "z", fill="white")
-        draw.text((110, 15), "Z", fill="white")
+    show_face("sleepy")
 
 
 def draw_sad_face():
-    with canvas(oled) as draw:
-        draw.line((25, 25, 30, 20), fill="white", width=3)
-        draw.line((35, 20, 40, 25), fill="white", width=3)
-        draw.line((88, 25, 93, 20), fill="white", width=3)
-        draw.line((98, 20, 103, 25), fill="white", width=3)
-        draw.arc((40, 55, 88, 75), 180, 360, fill="white")
+    show_face("sad")
 
 
 def animate_talking(duration=1.0):
-    end_time = time.time() + duration
+    now = time.monotonic()
+    end_time = now + duration
     mouth_open = True
 
-    while time.time() < end_time:
+    while now < end_time:
         if mouth_open:
             draw_talking_face()
         else:
             draw_talking_mouth_closed()
 
-        buzzer.start(35)
-        freq = [500, 600, 700, 800, 650, 750][int(time.time() * 10) % 6]
-        buzzer.ChangeFrequency(freq)
-        time.sleep(0.08)
-        buzzer.stop()
+        freq = [500, 600, 700, 800, 650, 750][int(now * 10) % 6]
+        play_beep((35, ((freq, 80),)))
 
         mouth_open = not mouth_open
-        time.sleep(0.08)
+        time.sleep(0.16)
+        now = time.monotonic()
+
+
+# The TFT frame is kept in memory; tft_write_lines() redraws only the text
+# lines that changed and sends just the rectangle they cover over SPI.
+TFT_WIDTH, TFT_HEIGHT = 320, 240
+LINE_HEIGHT = 38
+_tft_image = Image.new('RGB', (TFT_WIDTH, TFT_HEIGHT), 'black')
+_tft_draw = ImageDraw.Draw(_tft_image)
+_tft_lines = None   # (bg, {y: (text, color)}) on the glass; None = unknown
+_tft_ink = {}       # y -> (x0, x1) columns inked by the line drawn there
+_last_tft_call = None  # (lines, color, bg) of the last tft_write_lines()
+
+
+# Glyphs are rasterized once into "L" masks; drawing a line is then one
+# paste per character instead of a PIL text layout.  Pens advance by each
+# glyph's own width with no kerning, so spacing can differ from
+# ImageDraw.text() by a pixel for some letter pairs.
+def _render_glyph(ch):
+    """Return (mask or None, left, top, right, advance) for *ch*."""
+    left, top, right, bottom = font.getbbox(ch)
+    mask = None
+    if right > left and bottom > top:
+        mask = Image.new('L', (right - left, bottom - top))
+        ImageDraw.Draw(mask).text((-left, -top), ch, fill=255, font=font)
+    return mask, left, top, right, font.getlength(ch)
+
+
+_GLYPHS = {chr(c): _render_glyph(chr(c)) for c in range(32, 127)}
+
+
+def _glyph(ch):
+    glyph = _GLYPHS.get(ch)
+    if glyph is None:
+        glyph = _GLYPHS[ch] = _render_glyph(ch)
+    return glyph
+
+
+def _text_width(text):
+    return round(sum(_glyph(ch)[4] for ch in text))
+
+
+def _draw_string(x, y, text, fill):
+    """Paste *text* into the frame with its origin at (x, y); returns the
+    (x0, x1) columns it inked."""
+    ink0, ink1 = TFT_WIDTH, 0
+    pen = x
+    for ch in text:
+        mask, left, top, right, advance = _glyph(ch)
+        if mask is not None:
+            gx = round(pen) + left
+            _tft_image.paste(fill, (gx, y + top), mask)
+            ink0 = min(ink0, gx)
+            ink1 = max(ink1, gx + right - left)
+        pen += advance
+    return max(0, ink0), min(TFT_WIDTH, ink1)
+
+
+def _tft_push(x0, y0, x1, y1):
+    """Send the frame's x0..x1-1, y0..y1-1 rectangle to the TFT in one window."""
+    if x1 - x0 >= TFT_WIDTH and y1 - y0 >= TFT_HEIGHT:
+        tft.display(_tft_image)
+        return
+    tft.set_window(x0, y0, x1 - 1, y1 - 1)
+    pixels = tft.image_to_data(_tft_image.crop((x0, y0, x1, y1)), 0)
+    for i in range(0, len(pixels), 4096):
+        tft.data(pixels[i:i + 4096])
+
+
+def tft_show_image(image):
+    """Put a full-screen image (e.g. a photo) on the TFT."""
+    global _tft_lines, _last_tft_call
+    _tft_image.paste(image)
+    _tft_push(0, 0, TFT_WIDTH, TFT_HEIGHT)
+    _tft_lines = _last_tft_call = None
 
 
 def tft_write_lines(lines, color='white', bg='black'):
-    image = Image.new('RGB', (320, 240), color=bg)
-    draw = ImageDraw.Draw(image)
-    display_lines = lines[:6]
-    line_height = 38
-    total_height = len(display_lines) * line_height
-    y = (240 - total_height) // 2
-    for line in display_lines:
-        bbox = draw.textbbox((0, 0), line[:22], font=font)
-        text_width = bbox[2] - bbox[0]
-        x = (320 - text_width) // 2
-        draw.text((x, y), line[:22], fill=color, font=font)
-        y += line_height
-    tft.display(image)
-
-
-def record_audio(duration=5, sample_rate=16000):
-    print(f"Recording for {duration} seconds...")
+    global _tft_lines, _last_tft_call
+    call = (list(lines), color, bg)
+    if call == _last_tft_call:
+        return
+    _last_tft_call = call
+    display_lines = [line[:22] for line in lines[:6]]
+    y = (TFT_HEIGHT - len(display_lines) * LINE_HEIGHT) // 2
+    new = {y + i * LINE_HEIGHT: (text, color)
+           for i, text in enumerate(display_lines)}
+
+    if _tft_lines is None or _tft_lines[0] != bg:
+        dirty = list(new)
+        _tft_draw.rectangle((0, 0, TFT_WIDTH, TFT_HEIGHT), fill=bg)
+        _tft_ink.clear()
+        box = [0, 0, TFT_WIDTH, TFT_HEIGHT]
+    else:
+        old = _tft_lines[1]
+        dirty = [y for y in set(old) | set(new) if old.get(y) != new.get(y)]
+        if not dirty:
+            return
+        # Columns: union of the old and new ink of the dirty lines
+        box = [TFT_WIDTH, min(dirty), 0, max(dirty) + LINE_HEIGHT]
+        for y in dirty:
+            _tft_draw.rectangle((0, y, TFT_WIDTH, y + LINE_HEIGHT - 1), fill=bg)
+            if y in _tft_ink:
+                x0, x1 = _tft_ink.pop(y)
+                box[0] = min(box[0], x0)
+                box[2] = max(box[2], x1)
+
+    for y in dirty:
+        if y not in new or not new[y][0]:
+            continue
+        text, fill = new[y]
+        x = (TFT_WIDTH - _text_width(text)) // 2
+        x0, x1 = _draw_string(x, y, text, fill)
+        if x0 >= x1:
+            continue
+        _tft_ink[y] = (x0, x1)
+        box[0] = min(box[0], x0)
+        box[2] = max(box[2], x1)
+    _tft_lines = (bg, new)
+    if box[0] < box[2]:
+        _tft_push(*box)
+
+
+WAV_HEADER = struct.Struct('<4sI4s4sIHHIIHH4sI')
+
+# Voice activity detection on 20 ms frames
+VAD_THRESHOLD = 500      # int16 RMS that counts as speech (tune per mic/room)
+VAD_START_FRAMES = 3     # this many loud frames in a row start the take
+VAD_STOP_FRAMES = 40     # this many quiet frames in a row (0.8 s) end it
+VAD_PREROLL_FRAMES = 10  # frames kept from just before speech was detected
+VAD_WAIT_S = 5           # how long to wait for speech to start
+
+
+def record_audio(max_duration=10, sample_rate=16000, wait_timeout=VAD_WAIT_S):
+    """Record from the I2S mic until the speaker goes quiet (or max_duration
+    seconds after speech starts) and return the take as an in-memory WAV.
+
+    If nothing crosses the VAD threshold within wait_timeout seconds, the
+    last max_duration seconds heard are returned instead, so a quiet
+    speaker still reaches Whisper."""
+    wait_beeps()  # keep the piezo out of the recording
+    print(f"Listening for up to {max_duration} seconds...")
     # I2S mic requires 48kHz stereo, audio on right channel (L/R tied to 3.3V)
     rec_rate = 48000
-    audio = sd.rec(
-        int(duration * rec_rate),
+    step = rec_rate // sample_rate
+    threshold_sq = VAD_THRESHOLD ** 2
+    # Frames are converted to 16 kHz mono int16 as they arrive, after room
+    # for the header, so the finished take needs no post-processing.
+    buf = bytearray(WAV_HEADER.size)
+    # Everything heard before speech starts, bounded to one full take
+    pending = deque(maxlen=max_duration * 50)
+    started = threading.Event()
+    done = threading.Event()
+    loud = quiet = 0
+    speaking = False
+
+    def on_audio(indata, frames, time_info, status):
+        nonlocal loud, quiet, speaking
+        if done.is_set():
+            return
+        # Right channel, 48kHz -> 16kHz (every 3rd sample), int32 -> int16
+        frame = (indata[::step, 1] >> 16).astype('<i2')
+        is_loud = np.mean(np.square(frame, dtype=np.int32)) > threshold_sq
+        if not speaking:
+            pending.append(frame.tobytes())
+            loud = loud + 1 if is_loud else 0
+            if loud >= VAD_START_FRAMES:
+                speaking = True
+                for chunk in list(pending)[-VAD_PREROLL_FRAMES:]:
+                    buf.extend(chunk)
+                pending.clear()
+                started.set()
+        else:
+            buf.extend(frame.tobytes())
+            quiet = 0 if is_loud else quiet + 1
+            if quiet >= VAD_STOP_FRAMES:
+                done.set()
+
+    with sd.InputStream(
         samplerate=rec_rate,
         channels=2,
         dtype='int32',
-        device=0  # I2S mic (card 0)
-    )
-    sd.wait()
-    # Extract right channel and downsample 48kHz -> 16kHz (factor of 3)
-    right = audio[:, 1]
-    downsampled = right[::3]
-    # Convert int32 to int16
-    mono_16 = (downsampled >> 16).astype('int16')
-    return mono_16.reshape(-1, 1), sample_rate
+        blocksize=rec_rate // 50,  # 20 ms
+        device=0,  # I2S mic (card 0)
+        callback=on_audio
+    ):
+        if started.wait(wait_timeout):
+            done.wait(max_duration)
+
+    if not speaking:
+        # Nothing crossed the threshold; send the take so Whisper decides
+        for chunk in pending:
+            buf.extend(chunk)
+    data_size = len(buf) - WAV_HEADER.size
+    WAV_HEADER.pack_into(
+        buf, 0, b'RIFF', 36 + data_size, b'WAVE', b'fmt ', 16,
+        1, 1, sample_rate, sample_rate * 2, 2, 16, b'data', data_size)
+    return io.BytesIO(buf)
 
 
 # Main Loop
 def main():
-    global last_interaction_time, conversation_history, buddy_name, user_name
+    global last_interaction_time, buddy_name, user_name
 
     print("Classroom Buddy starting up!")
 
@@ -571,19 +885,14 @@ def main():
     beep_listening()
 
     # Wait for button press to record buddy name
-    while GPIO.input(BUTTON_PIN) == GPIO.HIGH:
-        time.sleep(0.1)
-    while GPIO.input(BUTTON_PIN) == GPIO.LOW:
-        time.sleep(0.1)
-    time.sleep(0.2)
+    wait_for_click()
 
     draw_listening_face()
     beep_listening()
     tft_write_lines(["Listening..."])
-    audio, sample_rate = record_audio(duration=4)
-    wav.write("question.wav", sample_rate, audio)
+    audio = record_audio(max_duration=4)
     tft_write_lines(["Thinking..."])
-    name_text = transcribe_audio("question.wav").strip()
+    name_text = transcribe_audio(audio).strip()
     name_text = name_text.rstrip('.!?,')
     if name_text:
         buddy_name = name_text
@@ -600,19 +909,14 @@ def main():
         "Press button to talk"
     ])
 
-    while GPIO.input(BUTTON_PIN) == GPIO.HIGH:
-        time.sleep(0.1)
-    while GPIO.input(BUTTON_PIN) == GPIO.LOW:
-        time.sleep(0.1)
-    time.sleep(0.2)
+    wait_for_click()
 
     draw_listening_face()
     beep_listening()
     tft_write_lines(["Listening..."])
-    audio, sample_rate = record_audio(duration=4)
-    wav.write("question.wav", sample_rate, audio)
+    audio = record_audio(max_duration=4)
     tft_write_lines(["Thinking..."])
-    name_text = transcribe_audio("question.wav").strip()
+    name_text = transcribe_audio(audio).strip()
     name_text = name_text.rstrip('.!?,')
     if name_text:
         user_name = name_text
@@ -628,28 +932,30 @@ def main():
     ])
     time.sleep(2)
 
-    last_interaction_time = time.time()
+    last_interaction_time = time.monotonic()
 
     while True:
         try:
             # Wait for button (idle timeout is checked inside)
             press_duration = wait_for_button_press()
-            last_interaction_time = time.time()
+            last_interaction_time = time.monotonic()
             beep_button()
             use_vision = press_duration >= 2.0
 
             if use_vision:
                 print("Long press - VISION mode")
+                # The camera works while the face, beep and text update
+                photo_future = executor.submit(capture_photo, "photo.jpg")
                 draw_camera_face()
+                beep_photo()
                 tft_write_lines([
                     f"{buddy_name}",
                     "",
                     "Taking photo..."
                 ])
-                time.sleep(0.5)
-                beep_photo()
-                photo_file = take_photo("photo.jpg")
-                time.sleep(0.5)
+                photo = photo_future.result()
+                show_photo(photo)
+                time.sleep(0.5)  # let them see what was captured
             else:
                 print("Short press - Voice mode")
 
@@ -662,8 +968,7 @@ def main():
                 "Listening..."
             ])
 
-            audio, sample_rate = record_audio(duration=5)
-            wav.write("question.wav", sample_rate, audio)
+            audio = record_audio()
 
             # THINKING
             draw_thinking_face()
@@ -675,7 +980,7 @@ def main():
             ])
 
             print("Transcribing...")
-            question = transcribe_audio("question.wav").strip()
+            question = transcribe_audio(audio).strip()
             print(f"\nStudent asked: {question}")
 
             if not question:
@@ -712,10 +1017,10 @@ def main():
 
             if use_vision:
                 # Vision - Claude
-                with open(photo_file, "rb") as image_file:
-                    image_data = base64.b64encode(image_file.read()).decode("utf-8")
+                image_data = base64.b64encode(photo.getbuffer()).decode("ascii")
 
-                message = claude_client.messages.create(
+                # Streamed so the face can start talking on the first token
+                with claude_client.messages.stream(
                     model="claude-sonnet-4-20250514",
                     max_tokens=150,
                     messages=[
@@ -732,23 +1037,27 @@ def main():
                                 },
                                 {
                                     "type": "text",
-                                    "text": f"""{get_system_prompt()}
-Look at this image and answer: {question}
-
-Additional guidelines for vision:
-- Describe what you see clearly
-- Keep responses SHORT (2-3 sentences max)"""
+                                    "text": f"{get_system_prompt()}\nLook at this image and answer: "
+                                            f"{question}{VISION_GUIDELINES}"
                                 }
                             ]
                         }
                     ]
-                )
-                response = message.content[0].text
+                ) as stream:
+                    parts = []
+                    for text in stream.text_stream:
+                        if not parts:
+                            draw_talking_face()
+                        parts.append(text)
+                response = "".join(parts)
             else:
                 # Voice - Groq with history
-                messages = [{"role": "system", "content": get_system_prompt()}]
-                messages.extend(conversation_history)
-                messages.append({"role": "user", "content": question})
+                user_message = {"role": "user", "content": question}
+                messages = [
+                    {"role": "system", "content": get_system_prompt()},
+                    *conversation_history,
+                    user_message
+                ]
 
                 completion = groq_client.chat.completions.create(
                     model="llama-3.3-70b-versatile",
@@ -757,25 +1066,15 @@ Additional guidelines for vision:
                 )
                 response = completion.choices[0].message.content
 
-                # Add to history
-                conversation_history.append({"role": "user", "content": question})
+                # Add to history (the deque keeps the last 20 messages)
+                conversation_history.append(user_message)
                 conversation_history.append({"role": "assistant", "content": response})
 
-                # Keep last 20 messages
-                if len(conversation_history) > 20:
-                    conversation_history = conversation_history[-20:]
-
             print(f"\nResponse: {response}\n")
             print(f"History: {len(conversation_history)} messages\n")
 
             # TALKING with animation
-            words = response.split()
-            lines = [""]
-            for word in words:
-                if len(lines[-1]) + len(word) + 1 <= 22:
-                    lines[-1] += (" " if lines[-1] else "") + word
-                else:
-                    lines.append(word)
+            lines = textwrap.wrap(response, width=22) or [""]
 
             for i in range(0, len(lines), 5):
                 chunk = lines[i:i + 5]